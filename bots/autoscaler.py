@@ -0,0 +1,91 @@
+import asyncio
+import bisect
+import time
+from typing import TYPE_CHECKING, Dict
+
+from .governor import governor
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    from houdini.plugins.bots import BotPlugin
+
+
+class Autoscaler:
+    """Keeps the bot population at a time-of-day share of the real players, within the host's headroom.
+
+    The schedule's population curve, when configured, is the floor under that share while
+    any real player is online; an empty world drops to `minimum`.
+
+    Moves at most `step` bots per interval so joins and leaves are spread out, and only grows
+    while loop lag and CPU use leave room for more bots.
+    """
+
+    def __init__(self, plugin: 'BotPlugin', ratios: Dict[str, float] = None, minimum: int = 0, maximum: int = 200,
+                 step: int = 10, interval: float = 60.0, lag_ceiling: float = 0.05, cpu_ceiling: float = 0.7):
+        self.plugin = plugin
+        self.configure(ratios, minimum, maximum, step, interval, lag_ceiling, cpu_ceiling)
+        self.enabled = True
+        self.target = 0
+        self._lag = metrics.loop_lag.snapshot()
+        self._cpu = (time.process_time(), time.monotonic())
+
+    def configure(self, ratios: Dict[str, float] = None, minimum: int = 0, maximum: int = 200, step: int = 10,
+                  interval: float = 60.0, lag_ceiling: float = 0.05, cpu_ceiling: float = 0.7):
+        ratios = ratios or {'0': 1.0}
+        self.hours = sorted(int(hour) for hour in ratios)  # each ratio applies from its hour until the next
+        self.ratios = [ratios[str(hour)] for hour in self.hours]
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.interval = interval
+        self.lag_ceiling = lag_ceiling  # loop lag p95, seconds
+        self.cpu_ceiling = cpu_ceiling  # share of one core used by the process
+
+    def ratio(self, hour: float) -> float:
+        return self.ratios[bisect.bisect_right(self.hours, hour) - 1]
+
+    def players(self) -> int:
+        return sum(1 for p in self.plugin.server.penguins_by_id.values() if not getattr(p, 'is_bot', False))
+
+    def headroom(self) -> tuple:
+        """Loop lag p95 and CPU share since the last call."""
+        lag = metrics.loop_lag.since(self._lag).percentile(95)
+        self._lag = metrics.loop_lag.snapshot()
+
+        cpu, wall = time.process_time(), time.monotonic()
+        share = (cpu - self._cpu[0]) / max(1e-9, wall - self._cpu[1])
+        self._cpu = (cpu, wall)
+        return lag, share
+
+    def desired(self) -> int:
+        hour = self.plugin.schedule.hour()
+        players = self.players()
+        wanted = round(players * self.ratio(hour))
+        if players:  # no one to entertain, so no schedule floor
+            wanted = max(wanted, self.plugin.schedule.population(hour) or 0)
+        return max(self.minimum, min(self.maximum, wanted))
+
+    async def adjust(self):
+        current = len(self.plugin.active_bots)
+        lag, cpu = self.headroom()
+        self.target = self.desired()
+
+        if lag > self.lag_ceiling or cpu > self.cpu_ceiling:
+            population = min(current, max(self.minimum, current - self.step))  # over capacity, shed bots whatever the ratio says, never add
+        elif self.target > current:
+            if governor.level > 0 or lag > self.lag_ceiling / 2 or cpu > self.cpu_ceiling * 0.75:
+                return  # hold, the host is close to its ceiling
+            population = min(self.target, current + self.step)
+        else:
+            population = max(self.target, current - self.step)
+
+        if population != current:
+            self.plugin.server.logger.info(f"Bot population {current} -> {population} (target {self.target}, "
+                                           f"loop lag p95 {lag * 1000:.1f}ms, cpu {cpu:.0%})")
+            await self.plugin.populate(population)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.enabled:
+                await self.adjust()
@@ -1,8 +1,6 @@
 import asyncio
-import itertools
 import math
 from pickle import OBJ
-import random
 from inspect import signature
 from typing import List, Tuple, TYPE_CHECKING
 
@@ -11,15 +9,20 @@ from houdini.data.room import Room, RoomWaddle, PenguinIglooRoomCollection
 from houdini.handlers.play.igloo import create_first_igloo
 from houdini.penguin import Penguin
 
-from .constants import ITEM_TYPE, ROOM_AREAS, ROOM_SPOTS, SAFE_MESSAGES, RoomSpotsController
+from .constants import ITEM_TYPE, ROOM_GEOMETRY, ROOM_SPOTS, SAFE_MESSAGES, RoomSpotsController
 from .games import SledRacing
+from .languagemodel.converse import Conversation
+from .clock import now
+from .governor import governor
+from .metrics import metrics
+from .rng import streams
 
 if TYPE_CHECKING:
     from houdini.plugins.bots import BotPlugin
 
 class FakeWriter:
     def get_extra_info(self, _):
-        return str(random.randbytes(10))
+        return str(streams.movement.randbytes(10))
     
     def is_closing(self):
         return False
@@ -27,6 +30,8 @@ class FakeWriter:
     def write(self, *args, **kwargs):
         pass
 
+FAKE_WRITER = FakeWriter() # stateless, shared by every bot
+
 class PenguinBot(Penguin):
     # Class-level constants
     SNOWBALL_MARGIN = 25
@@ -40,20 +45,39 @@ class PenguinBot(Penguin):
     ACTIVITY_SLEEP_RANGE = range(5, 16)
     SPOT_SLEEP_RANGE = range(30, 120)
 
+    is_bot = True  # bots never count as a conversation's audience
+
     def __init__(self, penguin_id: str, plugin: 'BotPlugin'):
-        super().__init__(plugin.server, None, FakeWriter())
+        super().__init__(plugin.server, None, FAKE_WRITER)
         self.penguin_id = penguin_id
+        self.rng = streams.spawn('movement', penguin_id) # per bot, so other bots' activity doesn't shift its draws
         self.plugin = plugin
         self.config = plugin.config
         self.server = plugin.server
         self.penguin_data = None
-        self.following_penguin = None
+        self._following_penguin = None
         self.frame = 18
         self._activity_task = None
         self.called = False
-        self.talking = False
+        self._talking = False
         self._activity_loop_running = False
+        self._followed_at = 0.0
         self._activity_task = None
+        self._igloo = None # kept while the bot waits in the plugin's pool
+
+    def reset(self):
+        """Clears the last session's state so a pooled bot can come back online."""
+        self._following_penguin = None
+        self.called = False
+        self._talking = False
+        self.frame = 18
+        self._followed_at = 0.0
+
+    @classmethod
+    async def fetch_rows(cls, penguin_ids: List[int]) -> List[houdini.data.penguin.Penguin]:
+        """Full penguin rows for bots about to be materialised, in one query."""
+        PenguinData = houdini.data.penguin.Penguin
+        return await PenguinData.query.where(PenguinData.id.in_(penguin_ids)).gino.all()
 
     def load_data(self, data: houdini.data.penguin.Penguin) -> 'PenguinBot':
         self.update(**data.to_dict()) # update with Gino()
@@ -72,14 +96,45 @@ class PenguinBot(Penguin):
             await self.randomize_room()
             self.randomize_position()
         
+    @property
+    def following_penguin(self):
+        return self._following_penguin
+
+    @following_penguin.setter
+    def following_penguin(self, p):
+        self._following_penguin = p
+        self._engine_update()
+
+    @property
+    def talking(self) -> bool:
+        return self._talking
+
+    @talking.setter
+    def talking(self, talking: bool):
+        self._talking = talking
+        self._engine_update()
+
+    def _engine_update(self):
+        """Keeps the array engine's columns for this bot current, instead of it re-reading every bot each tick."""
+        if self.plugin.engine:
+            self.plugin.engine.update(self)
+
+    async def join_room(self, room):
+        await super().join_room(room)
+        self._engine_update()
+
     def begin_activity(self):
         """Starts or restarts the bot's activity loop."""
         self.stop_activity()
+        if self.plugin.engine: # the array engine drives idle activity for every bot at once
+            return self.plugin.engine.add(self)
         # self.server.logger.info(f"Beginning {self.nickname} Loop")
         self._activity_task = asyncio.create_task(self.activity_loop())
 
     def stop_activity(self):
         """Stops the bot's activity loop if it's running."""
+        if self.plugin.engine:
+            self.plugin.engine.remove(self)
         if self._activity_task:
             self._activity_task.cancel()
             self._activity_task = None
@@ -88,7 +143,7 @@ class PenguinBot(Penguin):
         """Main loop for periodic bot activities like moving and changing frames."""
         try:
             while True:
-                for _ in range(random.choice(self.ACTIVITY_CYCLE_RANGE)):
+                for _ in range(self.rng.choice(self.ACTIVITY_CYCLE_RANGE)):
                     await self.perform_activities()
                 await self.move_if_idle()
 
@@ -112,56 +167,51 @@ class PenguinBot(Penguin):
     async def maybe_random_frame(self):
         """Changes the bot's frame to a random valid one if enabled."""
         if self.plugin.ENABLE_RANDOM_FRAME and not self.called:
-            await asyncio.sleep(random.choice(self.ACTIVITY_SLEEP_RANGE))
-            await self.random_frame()
+            await self.rest()
+            if governor.stage.cosmetics:
+                await self.random_frame()
 
     async def maybe_random_move(self):
         """Moves the bot randomly if enabled."""
         if self.plugin.ENABLE_RANDOM_MOVEMENT:
-            await asyncio.sleep(random.choice(self.ACTIVITY_SLEEP_RANGE))
+            await self.rest()
             await self.random_move()
 
+    async def rest(self):
+        """Sleeps between activities, longer while the governor is shedding load."""
+        await asyncio.sleep(self.rng.choice(self.ACTIVITY_SLEEP_RANGE) * governor.stage.stretch)
+
     async def move_if_idle(self):
         """Moves the bot to a random room if not following another penguin."""
         if self.plugin.ENABLE_RANDOM_MOVEMENT and self.following_penguin is None and not self.called:
-            await asyncio.sleep(random.choice(self.ACTIVITY_SLEEP_RANGE))
+            await self.rest()
             await self.randomize_room()
 
     async def move_to_spot(self):
         """Moves the bot to a free spot in the room if available."""
         spots_controller = ROOM_SPOTS[self.room.id]
         max_occupation_likelihood = self.config.get("spot_max_probability", self.DEFAULT_MAX_SPOT_PROB)
-        if random.random() <= min(spots_controller.len_spots() / 3, max_occupation_likelihood):
+        if self.rng.random() <= min(spots_controller.len_spots() / 3, max_occupation_likelihood):
             with PenguinBotRoomSpots(spots_controller, self) as spot:
-                if not self.is_occupied(spot):
+                if spot is not None and not self.is_occupied(spot):
                     await self.move_and_sync_special_clothing(spot)
 
     def is_occupied(self, spot):
-        """Checks if the spot is occupied by another penguin."""
-
-        def is_close(position, penguin):
-            """Checks if another penguin is too close to the given spot location."""
-            distance_needed = self.config.get('spot_distance', self.DEFAULT_SPOT_DISTANCE)
-            penguin_distance = math.dist(position, (penguin.x, penguin.y))
-            return not isinstance(penguin, self.__class__) and penguin_distance <= distance_needed
-
-        for penguin in self.room.penguins_by_id.values():
-            if is_close(spot.position, penguin):
-                return True
-
-        return False
+        """Checks if a player is too close to the spot, via the plugin's spatial index of players."""
+        distance_needed = self.config.get('spot_distance', self.DEFAULT_SPOT_DISTANCE)
+        return self.plugin.spatial.occupied(self.room.id, spot.position, distance_needed)
 
     async def move_and_sync_special_clothing(self, spot):
         """Moves to the spot's location and equips clothing."""
         distance = math.dist((self.x, self.y), spot.position)
         self.x, self.y = spot.position
         self.frame = spot.frame
-        await self.room.send_xt('sp', self.id, self.x, self.y)
-        if spot.clothes:
+        await self.send_room('sp', self.id, self.x, self.y)
+        if spot.clothes and governor.stage.cosmetics:
             self.update_clothing(spot.clothes)
             await self.room_sync_clothing()
         await asyncio.sleep(distance / self.MOVEMENT_SPEED + 2)
-        await self.room.send_xt('sf', self.id, self.frame)
+        await self.send_room('sf', self.id, self.frame)
 
     def update_clothing(self, SpotClothes):
         """Updates the bot's clothing (i.e., drum sticks), or unequipped"""
@@ -172,19 +222,21 @@ class PenguinBot(Penguin):
         self.hand = SpotClothes.get(ITEM_TYPE.HAND, 0)
         self.feet = SpotClothes.get(ITEM_TYPE.FEET, 0)
 
+    @metrics.action
     async def random_frame(self):
         """Sets a random frame."""
-        self.frame = random.choice(self.VALID_FRAMES)
-        await self.room.send_xt('sf', self.id, self.frame)
+        self.frame = self.rng.choice(self.VALID_FRAMES)
+        await self.send_room('sf', self.id, self.frame)
 
+    @metrics.action
     async def random_move(self):
         """moves to a random position"""
         self.randomize_position()
-        await self.room.send_xt('sp', self.id, self.x, self.y)
+        await self.send_room('sp', self.id, self.x, self.y)
 
     async def handle_snowball(self, p, x: int, y: int):
         """Handles the bot's response to snowball throws."""
-        if self.is_snowballed(x, y):
+        if governor.stage.reactions and self.is_snowballed(x, y):
             await asyncio.sleep(1)
             await self.snowball_reaction(p)
 
@@ -192,6 +244,7 @@ class PenguinBot(Penguin):
         return x in range(self.x - self.SNOWBALL_MARGIN, self.x + self.SNOWBALL_MARGIN) and \
                y in range(self.y - self.SNOWBALL_MARGIN, self.y + self.SNOWBALL_MARGIN)
 
+    @metrics.action
     async def snowball_reaction(self, p):
         """React to a snowball throw based on plugin settings."""
         reactions = [
@@ -200,13 +253,13 @@ class PenguinBot(Penguin):
         ]
         enabled_reactions = [f for f, e in reactions if e]
         if enabled_reactions:
-            await random.choice(enabled_reactions)(p)
+            await self.rng.choice(enabled_reactions)(p)
 
     async def laments_snowball(self, _):
-        await self.room.send_xt('se', self.id, 4)
+        await self.send_room('se', self.id, 4)
 
     async def throws_snowball_back(self, p):
-        await self.room.send_xt('sb', self.id, p.x, p.y)
+        await self.send_room('sb', self.id, p.x, p.y)
 
     async def handle_safe_message(self, p, message_id: int):
         """Handles safe messages and acts on recieving them"""
@@ -223,11 +276,12 @@ class PenguinBot(Penguin):
         if reaction and is_enabled:
             await reaction(p) if len(signature(reaction).parameters) > 0 else await reaction()
 
+    @metrics.action
     async def give_greeting(self):
 
         '''Sends a random greeting message to the room'''
         self.logger.info(f"{self.username} is greeting the room")
-        await self.room.send_xt('ss', self.id, random.choice(self.config.get('greeting_messages', self.DEFAULT_GREETINGS)))
+        await self.send_room('ss', self.id, self.rng.choice(self.config.get('greeting_messages', self.DEFAULT_GREETINGS)))
 
     async def go_player_room(self, p, room: Room):
         self.x, self.y = p.x, p.y
@@ -235,6 +289,9 @@ class PenguinBot(Penguin):
 
     async def goto_coordinates(self, p, x: int, y: int):
         b = self
+        if now() - b._followed_at < governor.stage.follow_interval: # the player's next move will catch the bot up
+            return
+        b._followed_at = now()
         angle = math.atan2(b.y - y, b.x - x) # angle between the player's and the bot's coordinates
         min_distance = 40 # how far behind bots should follow players
         b.x = int(x + min_distance * math.cos(angle)) # offsetts in the X and Y direction
@@ -243,20 +300,20 @@ class PenguinBot(Penguin):
         b.toy = None
         p.logger.info(f"{b.username} Following {p.username} to {b.x}, {b.y}")
         await asyncio.sleep(0.5)
-        await b.room.send_xt('sp', b.id, b.x, b.y)
+        await b.send_room('sp', b.id, b.x, b.y)
 
     async def follow(self, p):
         """Begins to follow a penguin."""
         if not self.following_penguin:
             self.following_penguin = p
-            await self.room.send_xt('ss', self.id, SAFE_MESSAGES.OK)
+            await self.send_room('ss', self.id, SAFE_MESSAGES.OK)
             await self.goto_coordinates(p, p.x, p.y)
 
     async def stop_following(self):
         """Stops following a penguin."""
         if self.following_penguin:
             self.following_penguin = None
-            await self.room.send_xt('ss', self.id, SAFE_MESSAGES.SEE_U_LATER)
+            await self.send_room('ss', self.id, SAFE_MESSAGES.SEE_U_LATER)
             await asyncio.sleep(2)
             await self.randomize_room()
 
@@ -267,14 +324,22 @@ class PenguinBot(Penguin):
         if self.character in self.server.penguins_by_character_id:
             del self.server.penguins_by_character_id[self.character]
         await self.room.remove_penguin(self)
-        self._activity_task.cancel()
+        self.stop_activity()
         self.close_igloo()
+        Conversation.audit()
+        self.plugin.pool.release(self)
         self.server.logger.info(f'{self.username} disconnected')
 
+    async def send_room(self, *data):
+        """Sends a packet to the bot's room, counted per room in the metrics."""
+        metrics.count_packet(self.room.id)
+        await self.room.send_xt(*data)
+
     def meets_interaction_distance(self, p) -> bool:
         return math.dist((self.x, self.y), (p.x, p.y)) < self.config.get(
             'interaction_distance', self.DEFAULT_INTERACTION_DISTANCE)
             
+    @metrics.action
     async def room_sync_clothing(self):
         """sends clothing data to other clients in the room"""
         if not self.room:
@@ -284,41 +349,33 @@ class PenguinBot(Penguin):
             'upn': self.neck, 'upb': self.body, 'upa': self.hand,
             'upe': self.feet, 'upl': self.flag, 'upp': self.photo}
         for update, item_id in clothing_data.items():
-            await self.room.send_xt(update, self.id, item_id)
+            await self.send_room(update, self.id, item_id)
 
     def randomize_position(self):
         """Randomly assigns a new position to the bot in the room."""
-        self.random_position_in_room(ROOM_AREAS[self.room.id])
+        self.random_position_in_room(self.room.id)
 
-    def random_position_in_room(self, points: List[Tuple[int, int]]): # This treats the polygon (formed by the rooms boundaries) as being made up of multiple triangles for unpredictable positioning.
-        """Generates a random position within the room area."""
-        triangles = [(points[0], a, b) for a, b in itertools.pairwise(points[1:])]
-        triangles_areas = [self.area_of_triangle(t) for t in triangles]
-        (x1, y1), (x2, y2), (x3, y3) = random.choices(triangles, weights=triangles_areas)[0] # Larger triangles have a higher chance of being selected.
+    def random_position_in_room(self, room_id: int):
+        """Generates a random position within the room area, from its precompiled triangulation."""
+        (x1, y1), (x2, y2), (x3, y3) = ROOM_GEOMETRY.pick_triangle(room_id, self.rng) # Larger triangles have a higher chance of being selected.
         self.x, self.y = self.coordinates_in_triangle(x1, y1, x2, y2, x3, y3)
 
-    def area_of_triangle(self, triangle: Tuple[Tuple[int, int], Tuple[int, int], Tuple[int, int]]) -> float:
-        """Calculates the area of a triangle."""
-        (x1, y1), (x2, y2), (x3, y3) = triangle
-        return 0.5 * abs(x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
-
     def coordinates_in_triangle(self, x1, y1, x2, y2, x3, y3) -> Tuple[int, int]: # Generates random numbers to interpolate between the triangle's vertices, ensuring points are uniformly distributed inside the triangle
         """Generates a random point inside a triangle."""
-        r1, r2 = random.random(), random.random()
+        r1, r2 = self.rng.random(), self.rng.random()
         s1 = math.sqrt(r1)
         x = int(x1 * (1 - s1) + x2 * (1 - r2) * s1 + x3 * r2 * s1)
         y = int(y1 * (1 - s1) + y2 * (1 - r2) * s1 + y3 * r2 * s1)
         return x, y
 
+    @metrics.action
     async def randomize_room(self):
         """Moves to a random room based on plugin configuration."""
-        config_rooms = self.config.get('bot_rooms', self.plugin.room_ids)
-        available_rooms = [self.server.rooms[x] for x in config_rooms if self.room is None or x != self.room.id]
-
-        room_weights = self.config.get('room_weights', {})
-        room_weights = [room_weights.get(str(x.id), 1) for x in available_rooms]
+        rooms = self.plugin.schedule.room_table() # prebuilt per room set and time of day profile
+        room_id = rooms.sample(self.rng, exclude=self.room.id if self.room else None)
 
-        await self.join_room(random.choices(available_rooms, weights=room_weights)[0])
+        await self.join_room(self.server.rooms[room_id])
+        Conversation.audit()
 
     async def enter_waddle(self, PLAYER: Penguin, waddle: RoomWaddle):
         """Joins a waddle game if configured."""
@@ -337,20 +394,21 @@ class PenguinBot(Penguin):
 
             if waddle.game == 'sled':
                 game = SledRacing(self)
-                await game.play(waddle.id, random.choice(list(game.waddles[waddle.id].keys())))
+                await game.play(waddle.id, self.rng.choice(list(game.waddles[waddle.id].keys())))
 
             if previous_room:
                 await self.join_room(previous_room)
 
     async def open_igloo(self):
-        self.igloo_rooms = await PenguinIglooRoomCollection.get_collection(self.id)
-        await create_first_igloo(self, self.id)
-        igloo = self.igloo_rooms[self.igloo]
-        await igloo.update(
-            type=random.choice(list(self.server.igloos.keys())),
-            location=random.choice(list(self.server.locations.keys()))
-        ).apply()
-        self.server.open_igloos_by_penguin_id[self.id] = igloo
+        if self._igloo is None: # a pooled bot reopens the igloo it already loaded
+            self.igloo_rooms = await PenguinIglooRoomCollection.get_collection(self.id)
+            await create_first_igloo(self, self.id)
+            self._igloo = self.igloo_rooms[self.igloo]
+            await self._igloo.update(
+                type=self.rng.choice(list(self.server.igloos.keys())),
+                location=self.rng.choice(list(self.server.locations.keys()))
+            ).apply()
+        self.server.open_igloos_by_penguin_id[self.id] = self._igloo
 
     def close_igloo(self):
         if self.id in self.server.open_igloos_by_penguin_id:
@@ -364,7 +422,7 @@ class PenguinBotRoomSpots:
         self.clothes = {} # store the bot's original clothing
 
     def __enter__(self):
-        self.spot = next(x.pop(0) for x in self.controller.spots if x)
+        self.spot = self.controller.acquire()
         self.clothes = {
             ITEM_TYPE.HEAD: self.bot.head,
             ITEM_TYPE.FACE: self.bot.face,
@@ -382,4 +440,5 @@ class PenguinBotRoomSpots:
         self.bot.body = self.clothes[ITEM_TYPE.BODY]
         self.bot.hand = self.clothes[ITEM_TYPE.HAND]
         self.bot.feet = self.clothes[ITEM_TYPE.FEET]
-        self.controller.spots[self.spot.priority - 1].append(self.spot)
+        if self.spot is not None:
+            self.controller.release(self.spot)
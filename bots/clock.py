@@ -0,0 +1,54 @@
+import asyncio
+import time
+from typing import Awaitable, TypeVar
+
+T = TypeVar('T')
+
+
+class VirtualClockEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock jumps to the next timer whenever nothing is ready to run.
+
+    Every asyncio.sleep, call_later and wait_for in the plugin (activity, spot and rotation
+    intervals, sled race timings, chat pacing) then completes as fast as the CPU allows, in
+    the same order it would in real time. Meant for simulations without real network I/O.
+    """
+
+    def __init__(self, start: float = 0.0):
+        super().__init__()
+        self._virtual_time = start
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def _run_once(self):
+        scheduled = self._scheduled
+        if not self._ready and scheduled and scheduled[0]._when > self._virtual_time:
+            self._virtual_time = scheduled[0]._when
+        super()._run_once()
+
+    def advance(self, seconds: float):
+        """Moves the clock forward by hand, e.g. between scripted steps."""
+        self._virtual_time += seconds
+
+
+def now() -> float:
+    """Monotonic seconds from the running loop's clock, virtual or real."""
+    try:
+        return asyncio.get_running_loop().time()
+    except RuntimeError:
+        return time.monotonic()
+
+
+def run(main: Awaitable[T], virtual: bool = False) -> T:
+    """asyncio.run, optionally on a virtual clock."""
+    if not virtual:
+        return asyncio.run(main)
+
+    loop = VirtualClockEventLoop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
@@ -0,0 +1,219 @@
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+try:
+    import numpy as np
+except ImportError:  # the engine is optional, bots fall back to one activity loop each
+    np = None
+
+from .clock import now
+from .constants import ROOM_GEOMETRY
+from .governor import governor
+from .rng import streams
+
+if TYPE_CHECKING:
+    from houdini.plugins.bots import BotPlugin
+    from .bots import PenguinBot
+
+
+class ArrayEngine:
+    """Runs every bot's idle activity as per-tick array operations instead of a coroutine per bot.
+
+    Positions, frames, rooms and next-action times live in NumPy arrays indexed by slot. Each
+    tick picks the bots that are due, samples their new positions from the room polygons in
+    one vectorised pass, and only sends packets for bots in rooms that have real players.
+    Room changes and spot visits still run per bot, since they go through Houdini's rooms.
+
+    The room, idle and called columns are updated by the bots as they join rooms, follow and
+    talk (see update()), so a tick does no per-bot Python work until it has picked who is due.
+    Called bots (mascots) still move around like the activity loop has them, but skip spots,
+    frames and room changes.
+    """
+
+    ROOM_CHANGE_CHANCE = 1 / 40  # an activity cycle is ~20 frame/move pairs before a room change
+    SPOT_CHANCE = 0.25
+
+    def __init__(self, plugin: 'BotPlugin', capacity: int = 256, tick: float = 0.25):
+        self.plugin = plugin
+        self.tick_interval = tick
+        self.rng = np.random.default_rng(streams.spawn('movement', 'engine').getrandbits(64))
+        self.bots = []  # slot -> PenguinBot, None when free
+        self.slots = {}  # bot id -> slot
+        self.free = []
+
+        self.x = np.zeros(capacity, np.int32)
+        self.y = np.zeros(capacity, np.int32)
+        self.frame = np.zeros(capacity, np.int16)
+        self.room = np.full(capacity, -1, np.int32)  # index into the room geometry, -1 when roomless
+        self.next_action = np.zeros(capacity, np.float64)
+        self.busy = np.zeros(capacity, bool)  # running a per-bot action
+        self.idle = np.zeros(capacity, bool)  # neither following a player nor talking
+        self.called = np.zeros(capacity, bool)
+
+        self.room_index = {}  # room id -> geometry index
+        self.room_ids = []  # geometry index -> room id
+        self.triangles = np.zeros((0, 3, 2), np.float64)
+        self.keys = np.zeros(0, np.float64)  # geometry index + cumulative area share, per triangle
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _grow(self):
+        capacity = len(self.x) * 2
+        for name in ('x', 'y', 'frame', 'room', 'next_action', 'busy', 'idle', 'called'):
+            array = getattr(self, name)
+            grown = np.full(capacity, -1 if name == 'room' else 0, array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def add(self, bot: 'PenguinBot'):
+        if bot.id in self.slots:
+            return
+        if self.free:
+            slot = self.free.pop()
+            self.bots[slot] = bot
+        else:
+            slot = len(self.bots)
+            if slot == len(self.x):
+                self._grow()
+            self.bots.append(bot)
+        self.slots[bot.id] = slot
+        self.x[slot], self.y[slot], self.frame[slot] = bot.x, bot.y, bot.frame
+        self.busy[slot] = False
+        self.next_action[slot] = now() + self.rng.uniform(*self._sleep_range())
+        self.update(bot)
+
+    def update(self, bot: 'PenguinBot'):
+        """Re-reads a bot's room and state into its columns, after it joins a room, follows or talks."""
+        slot = self.slots.get(bot.id)
+        if slot is None:
+            return
+        self.room[slot] = self._geometry(bot.room.id) if bot.room else -1
+        self.idle[slot] = bot.following_penguin is None and not bot.talking
+        self.called[slot] = bot.called
+
+    def remove(self, bot: 'PenguinBot'):
+        slot = self.slots.pop(bot.id, None)
+        if slot is not None:
+            self.bots[slot] = None
+            self.room[slot] = -1
+            self.idle[slot] = False
+            self.free.append(slot)
+
+    def _sleep_range(self) -> tuple:
+        sleeps = self.plugin.bot_class.ACTIVITY_SLEEP_RANGE
+        return sleeps.start, sleeps.stop
+
+    def _geometry(self, room_id: int) -> int:
+        """The room's geometry index, copying its compiled triangles in the first time it's seen."""
+        if room_id in self.room_index:
+            return self.room_index[room_id]
+        index = self.room_index[room_id] = len(self.room_index)
+        self.room_ids.append(room_id)
+
+        geometry = ROOM_GEOMETRY[room_id]
+        triangles = np.array(geometry.triangles, np.float64)
+        shares = np.array(geometry.weights) / geometry.weights[-1]
+        shares[-1] = 1.0
+        self.triangles = np.concatenate([self.triangles, triangles])
+        self.keys = np.concatenate([self.keys, index + shares])
+        return index
+
+    def positions(self, rooms: 'np.ndarray') -> tuple:
+        """Uniform random points inside each room's area, triangles weighted by their area."""
+        picks = np.searchsorted(self.keys, rooms + self.rng.random(rooms.size), side='right')
+        triangles = self.triangles[picks]
+        s1 = np.sqrt(self.rng.random(rooms.size))[:, None]
+        r2 = self.rng.random(rooms.size)[:, None]
+        points = triangles[:, 0] * (1 - s1) + triangles[:, 1] * (1 - r2) * s1 + triangles[:, 2] * r2 * s1
+        return points[:, 0].astype(np.int32), points[:, 1].astype(np.int32)
+
+    def _populated(self, rooms: 'np.ndarray') -> 'np.ndarray':
+        """Rooms holding more penguins than this engine's bots, i.e. with real players in them."""
+        bots = np.bincount(rooms[rooms >= 0], minlength=len(self.room_ids))
+        penguins = np.zeros(len(self.room_ids), np.int64)
+        for index, room_id in enumerate(self.room_ids):
+            room = self.plugin.server.rooms.get(room_id)
+            if room is not None:
+                penguins[index] = len(room.penguins_by_id)
+        return penguins > bots
+
+    def _delegate(self, slot: int, bot: 'PenguinBot', action):
+        def done(_):
+            if self.bots[slot] is bot:
+                self.busy[slot] = False
+                self.x[slot], self.y[slot], self.frame[slot] = bot.x, bot.y, bot.frame
+
+        self.busy[slot] = True
+        asyncio.create_task(action()).add_done_callback(done)
+
+    async def tick(self):
+        count = len(self.bots)
+        if not self.slots:
+            return
+
+        plugin = self.plugin
+        rooms = self.room[:count]
+        current = now()
+        due = np.flatnonzero(self.idle[:count] & ~self.busy[:count] & (rooms >= 0) & (self.next_action[:count] <= current))
+        if not due.size:
+            return
+
+        stage = governor.stage
+        self.next_action[due] = current + self.rng.uniform(*self._sleep_range(), due.size) * stage.stretch
+
+        roll = self.rng.random(due.size)
+        free = ~self.called[due]  # mascots stay where they were called to
+        changing = free & (roll < self.ROOM_CHANGE_CHANCE) & plugin.ENABLE_RANDOM_MOVEMENT
+        spotting = free & ~changing & (roll < self.ROOM_CHANGE_CHANCE + self.SPOT_CHANCE) & plugin.ENABLE_SPOT_LOCATIONS
+        rest = ~changing & ~spotting
+        framing = free & rest & (self.rng.random(due.size) < 0.5) & plugin.ENABLE_RANDOM_FRAME & stage.cosmetics
+        moving = rest & ~framing & plugin.ENABLE_RANDOM_MOVEMENT
+
+        for slot in due[changing]:
+            self._delegate(slot, self.bots[slot], self.bots[slot].randomize_room)
+        for slot in due[spotting]:
+            self._delegate(slot, self.bots[slot], self.bots[slot].move_to_spot)
+
+        movers = due[moving]
+        self.x[movers], self.y[movers] = self.positions(rooms[movers])
+        framers = due[framing]
+        valid_frames = plugin.bot_class.VALID_FRAMES
+        self.frame[framers] = self.rng.integers(valid_frames.start, valid_frames.stop, framers.size)
+
+        populated = self._populated(rooms)
+        packets = []
+        for slot in movers:
+            bot = self.bots[slot]
+            bot.x, bot.y = int(self.x[slot]), int(self.y[slot])
+            if populated[rooms[slot]]:
+                packets.append(bot.send_room('sp', bot.id, bot.x, bot.y))
+        for slot in framers:
+            bot = self.bots[slot]
+            bot.frame = int(self.frame[slot])
+            if populated[rooms[slot]]:
+                packets.append(bot.send_room('sf', bot.id, bot.frame))
+        if packets:
+            await asyncio.gather(*packets)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                self.plugin.server.logger.error(f"Error in bot engine tick: {e}")
+
+
+def create_engine(plugin: 'BotPlugin') -> Optional[ArrayEngine]:
+    """The array engine when the config asks for it and NumPy is installed."""
+    if not plugin.config.get('array_engine', False):
+        return None
+    if not ArrayEngine.available():
+        plugin.server.logger.warning("array_engine needs numpy, falling back to per-bot activity loops")
+        return None
+    return ArrayEngine(plugin, tick=plugin.config.get('array_engine_tick', 0.25))
@@ -4,5 +4,7 @@ from .french import french
 from .anglo import anglo
 from .dwarf import dwarf
 from .human import human
+from .bulk import NameSpaceExhausted, GENERATORS
+from .space import NameSpace, name_space, capacity, sample_names, username_key
 
 
@@ -1,6 +1,5 @@
 from .data import anglo_data
 from .language import Language
-import random
 
 
 class Anglo(Language):
@@ -8,7 +7,7 @@ class Anglo(Language):
 
     @classmethod
     def _name1_male(cls) -> str:
-        prob = random.random() * 100
+        prob = cls.rng.random() * 100
         # 50% chance to use col1 + col2
         if prob < 50:
             cols = [anglo_data["name1_col1"], anglo_data["name1_col2"]]
@@ -19,7 +18,7 @@ class Anglo(Language):
 
     @classmethod
     def _name1_female(cls) -> str:
-        prob = random.random() * 100
+        prob = cls.rng.random() * 100
         # 50% chance of just using col1 + female suffix
         if prob < 50:
             cols = [anglo_data["name1_col1"], anglo_data["name1_female_suffixes"]]
@@ -42,5 +41,9 @@ class Anglo(Language):
 
         return name
 
+    @classmethod
+    def _name2_templates(cls):
+        return [(1.0, [anglo_data["name2_col1"], anglo_data["name2_col2"]])]
+
 
 anglo = Anglo.name
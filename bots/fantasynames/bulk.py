@@ -0,0 +1,23 @@
+import typing as t
+
+from .anglo import anglo
+from .dwarf import dwarf
+from .elf import elf
+from .french import french
+from .hobbit import hobbit
+from .human import human
+
+GENERATORS: t.List[t.Callable[[], str]] = [elf, dwarf, hobbit, french, anglo, human]
+
+
+class NameSpaceExhausted(Exception):
+    """
+    Raised when the name space runs out before the batch is complete. The
+    names that were found are kept in `names`.
+    """
+
+    def __init__(self, names: t.List[str], requested: int):
+        self.names = names
+        super().__init__(
+            f"Only {len(names)} of {requested} unique names could be generated."
+        )
@@ -1,6 +1,5 @@
 from .data import dwarf_data, compound_tables
 from .language import Language
-import random
 
 
 class Dwarf(Language):
@@ -14,7 +13,7 @@ class Dwarf(Language):
     @classmethod
     def _name1_female(cls) -> str:
         # 50% to add "-a" to a male name
-        if random.random() * 100 < 50:
+        if cls.rng.random() * 100 < 50:
             name = cls._name1_male() + "a"
         # 50% chance to use female col for second half of name
         else:
@@ -28,5 +27,9 @@ class Dwarf(Language):
         name = cls._name_from_lists(cols)
         return name
 
+    @classmethod
+    def _name2_templates(cls):
+        return [(1.0, [compound_tables["mountain_col1"], compound_tables["mountain_col2"]])]
+
 
 dwarf = Dwarf.name
@@ -1,6 +1,5 @@
 from .data import elf_data, compound_tables
 from .language import Language
-import random
 
 
 class Elf(Language):
@@ -21,7 +20,7 @@ class Elf(Language):
     @classmethod
     def _name2(cls) -> str:
         # 50% chance of elf-y surname or nature-y surname
-        if random.random() * 100 < 50:
+        if cls.rng.random() * 100 < 50:
             cols = [compound_tables["nature_col1"], compound_tables["nature_col2"]]
         else:
             cols = [elf_data["name1_col1"], elf_data["name2_col2"]]
@@ -29,5 +28,12 @@ class Elf(Language):
         name = cls._name_from_lists(cols)
         return name
 
+    @classmethod
+    def _name2_templates(cls):
+        return [
+            (0.5, [compound_tables["nature_col1"], compound_tables["nature_col2"]]),
+            (0.5, [elf_data["name1_col1"], elf_data["name2_col2"]]),
+        ]
+
 
 elf = Elf.name
@@ -1,5 +1,4 @@
 from .data import french_data
-import random
 from .language import Language
 
 
@@ -9,7 +8,7 @@ class French(Language):
     @classmethod
     def _name1_male(cls) -> str:
         # 50% chance col1 + col2
-        if random.random() * 100 <= 50:
+        if cls.rng.random() * 100 <= 50:
             cols = [french_data["name1_col1"], french_data["name1_col2"]]
         # 50% chance col1 + male suffix
         else:
@@ -37,5 +36,9 @@ class French(Language):
             name = prefix + name'''
         return name
 
+    @classmethod
+    def _name2_templates(cls):
+        return [(1.0, [french_data["name2_col1"], french_data["name2_col2"]])]
+
 
 french = French.name
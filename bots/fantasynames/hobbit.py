@@ -21,5 +21,9 @@ class Hobbit(Language):
         name = cls._name_from_lists(cols)
         return name
 
+    @classmethod
+    def _name2_templates(cls):
+        return [(1.0, [hobbit_data["name2_col1"], hobbit_data["name2_col2"]])]
+
 
 hobbit = Hobbit.name
@@ -2,14 +2,14 @@ from .data import anglo_data, compound_tables
 from .language import Language
 from .anglo import Anglo
 from .french import French
-import random
+import typing as t
 
 
 class Human(Language):
     @classmethod
     def _name1_male(cls) -> str:
         # 80% chance anglo name, 20% chance french
-        if random.random() * 100 <= 20:
+        if cls.rng.random() * 100 <= 20:
             name = French._name1("male")
         else:
             name = Anglo._name1("male")
@@ -18,7 +18,7 @@ class Human(Language):
     @classmethod
     def _name1_female(cls) -> str:
         # 80% chance anglo name, 20% chance french
-        if random.random() * 100 <= 20:
+        if cls.rng.random() * 100 <= 20:
             name = French._name1("female")
         else:
             name = Anglo._name1("female")
@@ -26,7 +26,7 @@ class Human(Language):
 
     @classmethod
     def _name2(cls) -> str:
-        prob = random.random() * 100
+        prob = cls.rng.random() * 100
         # 25% chance of anglo surname
         if prob <= 25:
             name = Anglo._name2()
@@ -35,26 +35,40 @@ class Human(Language):
             name = French._name2()
         # 50% chance surname is cobbled together from various tables
         else:
-            col1 = random.choice(
-                [
-                    compound_tables["mountain_col1"],
-                    compound_tables["nature_col1"],
-                    compound_tables["generic_col1"],
-                    compound_tables["generic_col1"],
-                ]
-            )
-            col2 = random.choice(
-                [
-                    compound_tables["mountain_col2"],
-                    compound_tables["nature_col2"],
-                    compound_tables["generic_col2"],
-                    compound_tables["generic_col2"],
-                    anglo_data["name2_col2"],
-                ]
-            )
+            col1 = cls.rng.choice(cls._compound_col1())
+            col2 = cls.rng.choice(cls._compound_col2())
             name = cls._name_from_lists([col1, col2])
 
         return name
 
+    @classmethod
+    def _compound_col1(cls) -> t.List[t.List[str]]:
+        return [
+            compound_tables["mountain_col1"],
+            compound_tables["nature_col1"],
+            compound_tables["generic_col1"],
+            compound_tables["generic_col1"],
+        ]
+
+    @classmethod
+    def _compound_col2(cls) -> t.List[t.List[str]]:
+        return [
+            compound_tables["mountain_col2"],
+            compound_tables["nature_col2"],
+            compound_tables["generic_col2"],
+            compound_tables["generic_col2"],
+            anglo_data["name2_col2"],
+        ]
+
+    @classmethod
+    def _name2_templates(cls):
+        col1s, col2s = cls._compound_col1(), cls._compound_col2()
+        compound = 0.5 / (len(col1s) * len(col2s))
+        return (
+            [(0.25 * p, cols) for p, cols in Anglo._name2_templates()]
+            + [(0.25 * p, cols) for p, cols in French._name2_templates()]
+            + [(compound, [col1, col2]) for col1 in col1s for col2 in col2s]
+        )
+
 
 human = Human.name
@@ -5,6 +5,8 @@ import random
 
 class Language(ABC):
     transformations: t.List[t.Dict] = []
+    rng: t.Any = random  # the module, or a seeded random.Random shared by all languages
+    _compiled_table: t.Optional[t.Dict[str, t.List[str]]] = None
 
     @classmethod
     def name(cls, gender: str = "any") -> str:
@@ -61,7 +63,7 @@ class Language(ABC):
         """
         Randomly returns either a masculine or feminine first name (50/50 chance).
         """
-        if random.random() * 100 < 50:
+        if cls.rng.random() * 100 < 50:
             return cls._name1_male()
         else:
             return cls._name1_female()
@@ -74,6 +76,15 @@ class Language(ABC):
         """
         pass
 
+    @classmethod
+    def _name2_templates(cls) -> t.List[t.Tuple[float, t.List[t.List[str]]]]:
+        """
+        Describes _name2 as (probability, columns) pairs, each column being
+        a list that _name_from_lists picks from. Used to enumerate the name
+        space, so it must be kept in step with _name2.
+        """
+        return []
+
     @classmethod
     def _transform(cls, name: str) -> str:
         """
@@ -85,42 +96,61 @@ class Language(ABC):
         Also has the following special rules for special "input" characters:
             - *: doubles previous char if not preceeded by a CVC pattern
         """
-        new_string = ""
+        return cls._transform_with(name, cls.rng.choice)
+
+    @classmethod
+    def _transform_with(
+        cls, name: str, pick: t.Callable[[t.List[str]], str]
+    ) -> str:
+        """
+        Same as _transform, but `pick` chooses each transformation's output,
+        so the name space can be enumerated as well as sampled.
+        """
+        table = cls._transformation_table()
+        chars: t.List[str] = []  # built in place, joined once at the end
         for char in name:
             new_char = char
-            prev_char = new_string[-1] if len(new_string) > 0 else ""
-            prev_prev_char = new_string[-2] if len(new_string) > 1 else ""
-
-            # "*" doubles previous char if not preceeded by a CVC pattern
-            # Ex: 'wil' + '*and' -> "willand", "wald" + '*and' -> 'waldan'
-            if char == "*":
-                if double_consonant(new_string):
-                    new_char = prev_char
-                else:
-                    new_char = ""
-            # "&" removes preceeding char if it's preceeded by a consontant
-            # Ex: 'ia' + 'l&er' -> 'ialer', 'sand' + 'l&er' -> 'sander'
-            if char == "&":
-                if is_vowel(prev_prev_char):
-                    new_char = ""
-                else:
-                    new_string = new_string[:-1]
-                    new_char = ""
-            # "#" removes preceeding char unless it's preceeded by a plosive
-            # Ex: 'and' + 'r#e' -> 'andre', 'sir' + 'r#e' -> 'sire'
-            if char == "#":
-                if prev_prev_char in "pbdtkgc":
+
+            if char in SPECIAL_CHARS:
+                prev_char = chars[-1] if chars else ""
+                prev_prev_char = chars[-2] if len(chars) > 1 else ""
+
+                # "*" doubles previous char if not preceeded by a CVC pattern
+                # Ex: 'wil' + '*and' -> "willand", "wald" + '*and' -> 'waldan'
+                if char == "*":
+                    new_char = prev_char if double_consonant(chars) else ""
+                # "&" removes preceeding char if it's preceeded by a consontant
+                # Ex: 'ia' + 'l&er' -> 'ialer', 'sand' + 'l&er' -> 'sander'
+                elif char == "&":
+                    if not is_vowel(prev_prev_char) and chars:
+                        chars.pop()
                     new_char = ""
+                # "#" removes preceeding char unless it's preceeded by a plosive
+                # Ex: 'and' + 'r#e' -> 'andre', 'sir' + 'r#e' -> 'sire'
                 else:
-                    new_string = new_string[:-1]
+                    if prev_prev_char not in PLOSIVES and chars:
+                        chars.pop()
                     new_char = ""
             # checks is character is in given transformations
+            outputs = table.get(char)
+            if outputs is not None:
+                new_char = pick(outputs)
+            chars.extend(new_char)
+        return "".join(chars)
+
+    @classmethod
+    def _transformation_table(cls) -> t.Dict[str, t.List[str]]:
+        """
+        Compiles cls.transformations once into a char -> outputs lookup. The
+        first transformation listed for an input wins, as in a linear scan.
+        """
+        table = cls.__dict__.get("_compiled_table")
+        if table is None:
+            table = {}
             for transformation in cls.transformations:
-                if char == transformation["input"]:
-                    new_char = random.choice(transformation["outputs"])
-                    break
-            new_string += new_char
-        return new_string
+                table.setdefault(transformation["input"], transformation["outputs"])
+            cls._compiled_table = table
+        return table
 
     @classmethod
     def _capitalize(cls, name: str) -> str:
@@ -144,10 +174,7 @@ class Language(ABC):
         Given one or more list of strings, randomly selects a string from each
         and returns the concatenated result.
         """
-        name = ""
-        for string_list in lists:
-            name += random.choice(string_list)
-        return name
+        return "".join([cls.rng.choice(string_list) for string_list in lists])
 
 
 # ----------------------
@@ -155,12 +182,16 @@ class Language(ABC):
 # ----------------------
 
 
+VOWELS = frozenset("aeiou")
+PLOSIVES = "pbdtkgc"
+SPECIAL_CHARS = frozenset("*&#")
+
+
 def is_vowel(char: str) -> bool:
-    vowels = ["a", "e", "i", "o", "u"]
-    return char in vowels
+    return char in VOWELS
 
 
-def double_consonant(string: str) -> bool:
+def double_consonant(string: t.Sequence[str]) -> bool:
     # the "double consonat rule" means that if the chars preceeding a special character
     # ("*" in our case) match a consonant-vowel-consonant pattern, we double the
     # final consonant. This helper function tests for that pattern.
@@ -169,11 +200,5 @@ def double_consonant(string: str) -> bool:
     if len(string) < 3:
         return True
 
-    prev_chars = string[-3:]
-    pattern = ""
-    for char in prev_chars:
-        if is_vowel(char):
-            pattern += "V"
-        else:
-            pattern += "C"
-    return pattern == "CVC"
+    c1, v, c2 = string[-3:]
+    return c1 not in VOWELS and v in VOWELS and c2 not in VOWELS
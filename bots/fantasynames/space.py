@@ -0,0 +1,208 @@
+import functools
+import itertools
+import math
+import random
+import typing as t
+
+from .bulk import GENERATORS, NameSpaceExhausted
+from .language import Language
+
+
+def username_key(name: str) -> str:
+    """
+    The username a bot named `name` ends up with: lowercased and cut to the
+    12 characters the penguin table allows.
+    """
+    return name.lower()[:12]
+
+
+class NameSpace:
+    """
+    Every name a Language can generate, enumerated once from its data tables
+    and deduplicated by `key`. Names are addressed by index, so the space can
+    be sampled without replacement instead of retrying on collisions.
+    """
+
+    def __init__(
+        self,
+        language: t.Type[Language],
+        key: t.Callable[[str], str] = username_key,
+    ):
+        self.language = language
+        self.key = key
+        self.raw = 0  # names generated before deduplication
+        self._probabilities: t.Dict[str, float] = {}
+        self._names: t.Dict[str, str] = {}
+        full_names: t.Dict[str, float] = {}
+
+        table = language._transformation_table()
+        for weight, columns in language._name2_templates():
+            column_p = weight / math.prod(len(column) for column in columns)
+            for parts in itertools.product(*columns):
+                template = "".join(parts)
+                options = [table[char] for char in template if char in table]
+                template_p = column_p / math.prod(len(o) for o in options)
+                for picks in itertools.product(*options):
+                    name = self._decode(template, picks)
+                    full_names[name] = full_names.get(name, 0.0) + template_p
+                    self.raw += 1
+
+        # several full names can share a username, the likeliest one names it
+        for name, probability in sorted(full_names.items(), key=lambda x: -x[1]):
+            name_key = self.key(name)
+            self._names.setdefault(name_key, name)
+            self._probabilities[name_key] = self._probabilities.get(name_key, 0.0) + probability
+
+        self.keys: t.List[str] = sorted(self._probabilities)
+
+    def _decode(self, template: str, picks: t.Tuple[str, ...]) -> str:
+        outputs = iter(picks)
+        return self.language._capitalize(
+            self.language._transform_with(template, lambda _: next(outputs))
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, index: int) -> str:
+        return self._names[self.keys[index]]
+
+    def __contains__(self, name: str) -> bool:
+        return self.key(name) in self._probabilities
+
+    def probability(self, name: str) -> float:
+        """Chance that a single call of the generator produces this name."""
+        return self._probabilities.get(self.key(name), 0.0)
+
+    @functools.cached_property
+    def effective_size(self) -> float:
+        """
+        Size of a uniform space with the same collision rate. Lower than
+        len(self) because some names are far likelier than others.
+        """
+        return 1 / sum(p * p for p in self._probabilities.values())
+
+    def collision_probability(self, count: int) -> float:
+        """
+        Chance that `count` random calls of the generator repeat a name
+        (birthday bound over the real name probabilities).
+        """
+        if count > len(self):
+            return 1.0
+        return 1 - math.exp(-count * (count - 1) / 2 / self.effective_size)
+
+    def indexes(self, rng: t.Optional[random.Random] = None) -> t.Iterator[int]:
+        """Every index once, in random order."""
+        rng = rng or Language.rng
+        return iter(rng.sample(range(len(self)), len(self)))
+
+    def sample(
+        self,
+        count: int,
+        exclude: t.Container[str] = frozenset(),
+        rng: t.Optional[random.Random] = None,
+    ) -> t.List[str]:
+        """
+        Returns `count` distinct names drawn without replacement, skipping
+        those whose key is in `exclude`.
+        """
+        names = []
+        for index in self.indexes(rng):
+            if len(names) == count:
+                break
+            if self.keys[index] not in exclude:
+                names.append(self[index])
+        if len(names) < count:
+            raise NameSpaceExhausted(names, count)
+        return names
+
+
+@functools.lru_cache(maxsize=None)
+def name_space(language: t.Type[Language]) -> NameSpace:
+    """Enumerates a language's space once per process."""
+    return NameSpace(language)
+
+
+def _languages(
+    generators: t.Optional[t.Sequence[t.Callable[[], str]]],
+) -> t.List[t.Type[Language]]:
+    return [g.__self__ for g in (generators or GENERATORS)]
+
+
+def capacity(
+    count: int = 0,
+    generators: t.Optional[t.Sequence[t.Callable[[], str]]] = None,
+) -> t.Dict[str, t.Dict[str, float]]:
+    """
+    Per language: names generated, distinct usernames, effective size and the
+    chance that `count` bots from that language alone would collide.
+    """
+    report = {}
+    for language in _languages(generators):
+        space = name_space(language)
+        report[language.__name__] = {
+            "raw": space.raw,
+            "distinct": len(space),
+            "effective": round(space.effective_size, 1),
+            "collision_probability": round(space.collision_probability(count), 4),
+        }
+    return report
+
+
+def sample_names(
+    count: int,
+    exclude: t.Container[str] = frozenset(),
+    generators: t.Optional[t.Sequence[t.Callable[[], str]]] = None,
+    rng: t.Optional[random.Random] = None,
+    warn: t.Optional[t.Callable[[str], None]] = None,
+    warn_ratio: float = 0.9,
+) -> t.List[str]:
+    """
+    Returns `count` distinct names without retry loops. Each name comes from
+    a randomly chosen language, which walks its own space in random order and
+    drops out once it has nothing left. Keys in `exclude` are skipped.
+
+    `warn` is called with a message for every language whose space is at
+    least `warn_ratio` used up once this batch is taken, before the batch is
+    returned or NameSpaceExhausted is raised.
+    """
+    rng = rng or Language.rng
+    spaces = [name_space(language) for language in _languages(generators)]
+    walks = {space: space.indexes(rng) for space in spaces}
+    taken: t.Set[str] = set()
+    names: t.List[str] = []
+
+    while len(names) < count:
+        if not walks:
+            if warn:
+                _warn_low(spaces, exclude, taken, warn, warn_ratio)
+            raise NameSpaceExhausted(names, count)
+        space = rng.choice(list(walks))
+        for index in walks[space]:
+            name_key = space.keys[index]
+            if name_key not in taken and name_key not in exclude:
+                taken.add(name_key)
+                names.append(space[index])
+                break
+        else:
+            del walks[space]
+
+    if warn:
+        _warn_low(spaces, exclude, taken, warn, warn_ratio)
+    return names
+
+
+def _warn_low(
+    spaces: t.List[NameSpace],
+    exclude: t.Container[str],
+    taken: t.Set[str],
+    warn: t.Callable[[str], None],
+    warn_ratio: float,
+):
+    for space in spaces:
+        used = sum(key in taken or key in exclude for key in space.keys)
+        if used >= warn_ratio * len(space):
+            warn(
+                f"{space.language.__name__} name space is {used / len(space):.0%} used "
+                f"({len(space) - used} of {len(space)} names left)"
+            )
@@ -1,5 +1,4 @@
 import asyncio
-import random
 from typing import TYPE_CHECKING
 
 from houdini import IWaddle
@@ -1373,7 +1372,7 @@ class SledRacing:
         await asyncio.sleep(2)
 
         last_time = 0
-        for move in random.choice(self.waddles[waddle_id][difficulty]):
+        for move in self.penguin.rng.choice(self.waddles[waddle_id][difficulty]):
             await asyncio.sleep(move["time"] / 1000 - last_time)
             last_time = move["time"] / 1000
             await self.penguin.waddle.send_xt(
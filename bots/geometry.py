@@ -0,0 +1,257 @@
+import argparse
+import bisect
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROOMS_FILE = os.path.join(os.path.dirname(__file__), 'rooms.json')
+CACHE_FILE = os.path.join(os.path.dirname(__file__), 'rooms.cache')
+
+FORMAT = 'BGC2'  # bumped whenever the compiled layout changes
+
+Point = Tuple[float, float]
+Triangle = Tuple[Point, Point, Point]
+
+
+class Spot(NamedTuple):
+    position: Point
+    frame: int
+    priority: int
+    clothes: Optional[Dict[str, int]]  # item type name -> item id
+
+
+class RoomGeometry(NamedTuple):
+    area: Tuple[Point, ...]  # walkable polygon, as authored
+    triangles: Tuple[Triangle, ...]  # the polygon ear-clipped into triangles
+    weights: Tuple[float, ...]  # cumulative triangle areas, for area-weighted picks
+    spots: Tuple[Spot, ...]
+
+
+def _cross(o: Point, a: Point, b: Point) -> float:
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _area(points) -> float:
+    """Signed shoelace area."""
+    return 0.5 * sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]))
+
+
+def _outline(area) -> List[Point]:
+    """The polygon without repeated vertices, including a closing repeat of the first one."""
+    points = []
+    for point in map(tuple, area):
+        if not points or point != points[-1]:
+            points.append(point)
+    while len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    return points
+
+
+def _segments_cross(a: Point, b: Point, c: Point, d: Point) -> bool:
+    d1, d2, d3, d4 = _cross(c, d, a), _cross(c, d, b), _cross(a, b, c), _cross(a, b, d)
+    if ((d1 > 0 > d2) or (d1 < 0 < d2)) and ((d3 > 0 > d4) or (d3 < 0 < d4)):
+        return True
+
+    def on(p, q, r):  # r collinear with pq and inside its bounding box
+        return min(p[0], q[0]) <= r[0] <= max(p[0], q[0]) and min(p[1], q[1]) <= r[1] <= max(p[1], q[1])
+
+    return (d1 == 0 and on(c, d, a)) or (d2 == 0 and on(c, d, b)) or (d3 == 0 and on(a, b, c)) or (d4 == 0 and on(a, b, d))
+
+
+def self_intersections(area) -> List[Tuple[int, int]]:
+    """Pairs of non-adjacent edges that touch or cross, by the index of their first vertex."""
+    points = _outline(area)
+    n = len(points)
+    edges = [(points[i], points[(i + 1) % n]) for i in range(n)]
+    return [(i, j) for i in range(n) for j in range(i + 2, n)
+            if not (i == 0 and j == n - 1) and _segments_cross(*edges[i], *edges[j])]
+
+
+def contains(area, point: Point) -> bool:
+    """Even-odd point in polygon; points on an edge count as inside."""
+    points = _outline(area)
+    x, y = point
+    inside = False
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        if _cross((x1, y1), (x2, y2), point) == 0 and min(x1, x2) <= x <= max(x1, x2) and min(y1, y2) <= y <= max(y1, y2):
+            return True
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def triangulate(area) -> List[Triangle]:
+    """Ear clipping, O(n^3) for a simple polygon of n vertices; degenerate ears are dropped."""
+    points = _outline(area)
+    if _area(points) < 0:
+        points.reverse()  # counter-clockwise, so convex corners have a positive cross product
+    triangles = []
+    remaining = list(points)
+    while len(remaining) > 3:
+        n = len(remaining)
+        for i in range(n):
+            a, b, c = remaining[i - 1], remaining[i], remaining[(i + 1) % n]
+            if _cross(a, b, c) < 0:
+                continue  # reflex corner
+            if any(p not in (a, b, c) and _cross(a, b, p) >= 0 and _cross(b, c, p) >= 0 and _cross(c, a, p) >= 0
+                   for p in remaining):
+                continue  # another vertex is inside the ear
+            if _cross(a, b, c) > 0:
+                triangles.append((a, b, c))
+            del remaining[i]
+            break
+        else:
+            raise ValueError("polygon is not simple, no ear left to clip")
+    if len(remaining) == 3 and _cross(*remaining) != 0:
+        triangles.append(tuple(remaining))
+    return triangles
+
+
+def fan(area) -> List[Triangle]:
+    """Triangles fanned out from the first vertex, the geometry used before rooms were triangulated properly."""
+    points = _outline(area)
+    return [(points[0], a, b) for a, b in zip(points[1:], points[2:])]
+
+
+def validate(catalog: dict) -> List[str]:
+    """Problems in a parsed rooms file, as readable messages; an empty list means it's clean."""
+    problems = []
+    rooms = {'default': catalog.get('default', {}), **catalog.get('rooms', {})}
+    for room_id, room in rooms.items():
+        area = room.get('area', [])
+        if len(_outline(area)) < 3:
+            problems.append(f"room {room_id}: area needs at least 3 distinct vertices")
+            continue
+        for i, j in self_intersections(area):
+            problems.append(f"room {room_id}: area edges {i} and {j} intersect")
+
+        seen = {}
+        for i, spot in enumerate(room.get('spots', [])):
+            position = tuple(spot['position'])
+            if not spot.get('outside_area') and not contains(area, position):  # flagged spots are deliberately off the area
+                problems.append(f"room {room_id}: spot {i} at {position} is outside the walkable area")
+            if position in seen:
+                problems.append(f"room {room_id}: spot {i} at {position} duplicates spot {seen[position]}")
+            seen.setdefault(position, i)
+    return problems
+
+
+def _compile_room(room: dict) -> RoomGeometry:
+    area = tuple(tuple(point) for point in room['area'])
+    try:
+        triangles = triangulate(area)
+    except ValueError:
+        triangles = fan(area)
+    weights, total = [], 0.0
+    for a, b, c in triangles:
+        total += abs(_cross(a, b, c)) / 2
+        weights.append(total)
+    spots = tuple(Spot(tuple(spot['position']), spot['frame'], spot['priority'], spot.get('clothes'))
+                  for spot in room.get('spots', []))
+    return RoomGeometry(area, tuple(triangles), tuple(weights), spots)
+
+
+def compile_catalog(catalog: dict) -> Tuple[RoomGeometry, Dict[int, RoomGeometry]]:
+    for problem in validate(catalog):
+        logger.warning(f"Room geometry: {problem}")
+    default = _compile_room(catalog['default'])
+    return default, {int(room_id): _compile_room(room) for room_id, room in catalog.get('rooms', {}).items()}
+
+
+def _plain(geometry: RoomGeometry) -> list:
+    """Lists and numbers only, so the cache is plain JSON."""
+    return [geometry.area, geometry.triangles, geometry.weights, [list(spot) for spot in geometry.spots]]
+
+
+def _restore(plain: list) -> RoomGeometry:
+    area, triangles, weights, spots = plain
+    return RoomGeometry(tuple(tuple(point) for point in area),
+                        tuple(tuple(tuple(point) for point in triangle) for triangle in triangles),
+                        tuple(weights),
+                        tuple(Spot(tuple(position), frame, priority, clothes) for position, frame, priority, clothes in spots))
+
+
+class Catalog:
+    """Compiled room geometry, read from the JSON cache while it matches the rooms file.
+
+    The cache is keyed by a digest of the rooms file, so editing the file recompiles it on
+    the next start. Rooms missing from the file get the default area, with a warning the first
+    time each one is asked for.
+    """
+
+    def __init__(self, default: RoomGeometry, rooms: Dict[int, RoomGeometry]):
+        self.default = default
+        self.rooms = rooms
+        self._missing = set()
+
+    def __contains__(self, room_id: int) -> bool:
+        return room_id in self.rooms
+
+    def __getitem__(self, room_id: int) -> RoomGeometry:
+        geometry = self.rooms.get(room_id)
+        if geometry is None:
+            if room_id not in self._missing:
+                self._missing.add(room_id)
+                logger.warning(f"Room {room_id} has no geometry in the rooms file, using the default area")
+            return self.default
+        return geometry
+
+    def pick_triangle(self, room_id: int, rng) -> Triangle:
+        """A triangle of the room's area, picked with probability proportional to its area."""
+        geometry = self[room_id]
+        return geometry.triangles[bisect.bisect_right(geometry.weights, rng.random() * geometry.weights[-1])
+                                  if len(geometry.triangles) > 1 else 0]
+
+    @classmethod
+    def load(cls, path: str = ROOMS_FILE, cache: Optional[str] = CACHE_FILE) -> 'Catalog':
+        with open(path, 'rb') as f:
+            source = f.read()
+        digest = hashlib.sha1(source).hexdigest()
+
+        if cache and os.path.exists(cache):
+            try:
+                with open(cache) as f:
+                    compiled = json.load(f)
+                if compiled.get('format') == FORMAT and compiled.get('digest') == digest:
+                    return cls(_restore(compiled['default']),
+                               {int(room_id): _restore(room) for room_id, room in compiled['rooms'].items()})
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                logger.warning(f"Room geometry cache {cache} is unreadable, recompiling")
+
+        default, rooms = compile_catalog(json.loads(source))
+        if cache:
+            try:
+                with open(cache, 'w') as f:
+                    json.dump({'format': FORMAT, 'digest': digest, 'default': _plain(default),
+                               'rooms': {room_id: _plain(room) for room_id, room in rooms.items()}}, f)
+            except OSError as e:
+                logger.warning(f"Could not write the room geometry cache {cache}: {e}")
+        return cls(default, rooms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the rooms file and rebuild its compiled cache")
+    parser.add_argument('--rooms', default=ROOMS_FILE)
+    parser.add_argument('--cache', default=CACHE_FILE)
+    args = parser.parse_args()
+
+    with open(args.rooms) as f:
+        problems = validate(json.load(f))
+    for problem in problems:
+        print(problem)
+    if os.path.exists(args.cache):
+        os.remove(args.cache)
+    catalog = Catalog.load(args.rooms, args.cache)
+    print(f"{len(catalog.rooms)} rooms, {sum(len(g.spots) for g in catalog.rooms.values())} spots, "
+          f"{len(problems)} problems")
+    raise SystemExit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
+
+# python -m houdini.plugins.bots.geometry
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import NamedTuple
+
+from .clock import now
+from .metrics import Histogram, metrics
+
+
+class Stage(NamedTuple):
+    stretch: float  # multiplier on bot activity sleeps
+    cosmetics: bool  # random frames and spot clothing syncs
+    rotation: bool
+    reactions: bool  # greetings and snowball reactions
+    conversations: bool  # new LLM conversations, otherwise canned fallbacks
+    follow_interval: float  # minimum seconds between a following bot's position updates
+
+
+class Governor:
+    """Sheds bot liveliness in stages while the event loop or player handlers lag, restoring it as pressure drops.
+
+    Steps up at most one stage per tick and waits `cooldown` seconds before stepping down,
+    so a single slow tick doesn't flap the bots between behaviours.
+    """
+
+    STAGES = [
+        Stage(1.0, True, True, True, True, 0.0),
+        Stage(2.0, False, True, True, True, 0.0),
+        Stage(4.0, False, False, True, True, 1.0),
+        Stage(8.0, False, False, False, False, 3.0),
+    ]
+
+    def __init__(self, lag_target: float = 0.05, handler_target: float = 2.0, interval: float = 2.0, cooldown: float = 30.0):
+        self.lag_target = lag_target  # p95 seconds the event loop may wake late
+        self.handler_target = handler_target  # p95 seconds per player packet; bot reactions, LLM conversations and
+        # waddle races run in tasks, so only the handlers' own work counts
+        self.interval = interval
+        self.cooldown = cooldown
+        self.level = 0
+        self.enabled = True
+        self._changed = 0.0
+        self._snapshots = {}
+
+    @property
+    def stage(self) -> Stage:
+        return self.STAGES[self.level if self.enabled else 0]
+
+    def _recent(self, name: str, histogram: Histogram) -> Histogram:
+        previous = self._snapshots.get(name)
+        self._snapshots[name] = histogram.snapshot()
+        return histogram.since(previous) if previous else Histogram()
+
+    def pressure(self) -> tuple:
+        """Loop lag and handler p95 since the last tick."""
+        lag = self._recent('loop_lag', metrics.loop_lag)
+        handlers = Histogram()
+        for name, histogram in list(metrics.handlers.items()):
+            handlers.merge(self._recent(name, histogram))
+        return lag.percentile(95), handlers.percentile(95)
+
+    def tick(self, logger: logging.Logger):
+        lag, handler = self.pressure()
+        current = now()
+
+        level = self.level
+        if (lag > self.lag_target or handler > self.handler_target) and level < len(self.STAGES) - 1:
+            level += 1
+        elif lag < self.lag_target / 2 and handler < self.handler_target / 2 and level > 0 \
+                and current - self._changed >= self.cooldown:
+            level -= 1
+
+        if level != self.level:
+            logger.info(f"Bot load stage {self.level} -> {level} (loop lag p95 {lag * 1000:.1f}ms, handler p95 {handler * 1000:.1f}ms)")
+            self.level = level
+            self._changed = current
+
+    async def watch(self, logger: logging.Logger):
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.enabled:
+                self.tick(logger)
+            else:
+                self.pressure()  # keep the snapshots current, so re-enabling judges only new samples
+                self.level = 0
+
+
+governor = Governor()
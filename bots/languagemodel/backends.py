@@ -0,0 +1,41 @@
+# Standard Imports
+from typing import List, Optional
+
+# Package Imports
+from . import logger
+from .breaker import CircuitBreaker
+
+class Backend:
+    """An Ollama host with its own circuit breaker and outstanding request count"""
+
+    def __init__(self, host: str, threshold: int = 3, probe_interval: float = 5.0):
+        self.host = host.rstrip("/")
+        self.api_url = f"{self.host}/api/generate"
+        self.breaker = CircuitBreaker(self.host, threshold, probe_interval)
+        self.outstanding = 0
+
+    def __repr__(self):
+        return f"Backend({self.host}, outstanding={self.outstanding}, open={self.breaker.open})"
+
+class BackendPool:
+    """Routes generations to the healthy backend with the fewest outstanding requests"""
+
+    def __init__(self, hosts: List[str], threshold: int = 3, probe_interval: float = 5.0):
+        self.backends = [Backend(host, threshold, probe_interval) for host in hosts]
+        logger.info(f"Ollama backends: {[b.host for b in self.backends]}")
+
+    def healthy(self) -> List[Backend]:
+        """Backends whose breaker is closed, open ones rejoin once their probe succeeds"""
+        return [b for b in self.backends if b.breaker.allow()]
+
+    def allow(self) -> bool:
+        return any(b.breaker.allow() for b in self.backends)
+
+    def route(self, sticky: Optional[Backend] = None) -> Optional[Backend]:
+        """Keeps a conversation on its backend while healthy, otherwise picks the least loaded one"""
+        if sticky is not None and sticky.breaker.allow():
+            return sticky
+        return min(self.healthy(), key=lambda b: b.outstanding, default=None)
+
+    def __repr__(self):
+        return f"BackendPool({self.backends})"
@@ -0,0 +1,108 @@
+# Standard Imports
+import argparse
+import asyncio
+import random
+import time
+
+# Package Imports
+from . import logger
+from . import converse
+from .backends import BackendPool
+from .cache import ResponseCache
+from .standin import add_arguments, from_arguments
+
+PROMPTS = [
+    "tell me about your latest voyage",
+    "what was the biggest storm you ever sailed through",
+    "do you have any treasure on the ship",
+    "what does yarr like to eat",
+    "have you ever seen a sea monster",
+]
+
+class FakeRoom:
+    """Room stand-in recording when each message reaches it"""
+
+    def __init__(self, room_id: int):
+        self.id = room_id
+        self.penguins_by_id = {}
+        self.first_message = None
+
+    async def send_xt(self, handler_id, *data):
+        if handler_id == 'sm' and self.first_message is None:
+            self.first_message = time.monotonic()
+
+class FakePenguin:
+
+    def __init__(self, penguin_id: int, nickname: str, room: FakeRoom, is_bot: bool = False):
+        self.id = penguin_id
+        self.nickname = nickname
+        self.username = nickname.lower()
+        self.room = room
+        self.x, self.y = random.randint(100, 600), random.randint(200, 400)
+        self.frame = 1
+        self.is_bot = is_bot
+        self.called = is_bot
+        self.talking = False
+        room.penguins_by_id[penguin_id] = self
+
+    async def send_room(self, *data):
+        await self.room.send_xt(*data)
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def report(name: str, values: list):
+    logger.info(f"{name:<24} n={len(values):<5} p50={percentile(values, 0.5):7.3f}s p95={percentile(values, 0.95):7.3f}s max={max(values, default=0.0):7.3f}s")
+
+async def run_room(room_id: int, bots: int, personas: list, results: dict):
+    """Drives one conversation through new_conversation -> generate -> respond"""
+    room = FakeRoom(room_id)
+    player = FakePenguin(room_id * 100, f"Player{room_id}", room)
+    participants = [FakePenguin(room_id * 100 + i + 1, personas[i % len(personas)], room, is_bot=True) for i in range(bots)]
+    sample = await converse.do_sample(participants)
+
+    started = time.monotonic()
+    await converse.new_conversation(random.choice(PROMPTS), sample, player)
+    while any(c.room is room for c in converse.Conversation.active):
+        await asyncio.sleep(0.05)
+
+    if room.first_message is not None:
+        results['first_sentence'].append(room.first_message - started)
+    results['end_to_end'].append(time.monotonic() - started)
+
+async def benchmark(args: argparse.Namespace):
+    server = from_arguments(args)
+    await server.start()
+
+    converse.Ollama.pool = BackendPool([server.url])
+    if args.no_cache:
+        converse.Ollama.cache = ResponseCache(maxsize=0)
+    converse.PersonaFileCreator.load_personas()
+    personas = list(converse.PersonaFileCreator.personas.keys())
+
+    results = {'first_sentence': [], 'end_to_end': []}
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(run_room(room_id, args.bots, personas, results) for room_id in range(1, args.rooms + 1)))
+    finally:
+        await converse.Ollama.close_session()
+        await server.stop()
+
+    logger.info(f"{args.rooms} rooms, {server.requests} requests, {server.failures} failures in {time.monotonic() - started:.2f}s")
+    report("queue wait", server.queue_waits)
+    report("time to first sentence", results['first_sentence'])
+    report("end to end", results['end_to_end'])
+    logger.info(f"cache: {converse.Ollama.cache.stats()}")
+
+# python -m houdini.plugins.bots.languagemodel.benchmark --rooms 50 --parallel 2
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversation pipeline benchmark against the Ollama stand-in")
+    add_arguments(parser)
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--bots', type=int, default=2, help="mascots per room")
+    parser.add_argument('--no-cache', action='store_true')
+    asyncio.run(benchmark(parser.parse_args()))
@@ -0,0 +1,56 @@
+# Standard Imports
+import asyncio
+
+# External Imports
+import aiohttp
+
+# Package Imports
+from . import logger
+
+class CircuitBreaker:
+    """Fails fast while an Ollama backend is down, probing /api/tags until it recovers"""
+
+    def __init__(self, host: str, threshold: int = 3, probe_interval: float = 5.0):
+        self.host = host
+        self.threshold = threshold  # consecutive failures before opening
+        self.probe_interval = probe_interval
+        self.failures = 0
+        self.open = False
+        self._probe_task = None
+
+    def allow(self) -> bool:
+        return not self.open
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if not self.open and self.failures >= self.threshold:
+            self.trip()
+
+    def trip(self):
+        """Opens the breaker and starts probing in the background"""
+        self.open = True
+        logger.error(f"{self.host} failed {self.failures} times in a row, circuit opened")
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self.probe())
+
+    def reset(self):
+        self.open = False
+        self.failures = 0
+        logger.info(f"{self.host} is healthy, circuit closed")
+
+    async def healthy(self, session: aiohttp.ClientSession) -> bool:
+        try:
+            async with session.get(f"{self.host}/api/tags", timeout=self.probe_interval) as response:
+                return response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def probe(self):
+        async with aiohttp.ClientSession() as session:
+            while self.open:
+                await asyncio.sleep(self.probe_interval)
+                if await self.healthy(session):
+                    self.reset()
@@ -0,0 +1,87 @@
+# Standard Imports
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional
+
+# Package Imports
+from ..clock import now
+from . import logger
+
+class ResponseCache:
+    """LRU/TTL cache of sampled responses, rotating between several per key"""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 600, samples: int = 3):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.samples = samples  # responses generated per key before rotating between them
+        self.entries = OrderedDict()  # key -> [expires, rotation index, responses]
+        self.inflight = {}  # key -> Future shared by identical concurrent requests
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _entry(self, key: Hashable) -> Optional[list]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < now():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Hashable, response: str):
+        entry = self._entry(key)
+        if entry is None:
+            entry = self.entries[key] = [now() + self.ttl, 0, []]
+        entry[2].append(response)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    async def fetch(self, key: Hashable, generate: Callable[[], Awaitable[str]]) -> str:
+        """Returns a cached response for the key, generating one when it still needs samples"""
+        while True:
+            entry = self._entry(key)
+            if entry is not None and len(entry[2]) >= self.samples:
+                self.hits += 1
+                entry[1] = (entry[1] + 1) % len(entry[2])
+                return entry[2][entry[1]]
+
+            if key not in self.inflight:
+                break
+
+            self.coalesced += 1
+            response = await asyncio.shield(self.inflight[key])
+            if response is not None:
+                return response
+            # the leading request was cancelled, try again
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        response = None
+
+        try:
+            response = await generate()
+        finally:
+            del self.inflight[key]
+            future.set_result(response)
+
+        if response: # failed generations are empty and never cached
+            self._store(key, response)
+        return response
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        logger.info("Response cache cleared")
@@ -1,7 +1,5 @@
 # Standard Imports
-import random
 import asyncio
-import time
 import datetime
 import json
 import re
@@ -14,18 +12,124 @@ import pytz
 import aiohttp
 
 # Package Imports
+from ..clock import now
+from ..governor import governor
+from ..rng import streams
 from . import *
 from .badword import contains_badword
+from .backends import BackendPool
+from .cache import ResponseCache
 from .create import PersonaFileCreator
+from .intents import IntentMatcher
+from .policy import LoadPolicy
 from .splitter import retrieve_sentences
 
 ################################################################
 
+class Conversation:
+    """Cancellation scope for a conversation, tied to the room's audience"""
+
+    active = set()  # conversations with pending work
+    check_interval = 1.0  # seconds between audience checks
+
+    def __init__(self, room: Optional[object] = None, participants: Optional[list] = None, p: Optional[object] = None):
+        self.room = room
+        self.participants = participants if participants is not None else []
+        self.p = p
+        self.speaker = None
+        self.cancelled = False
+        self.tasks = set()
+        self._watchdog = None
+
+    @staticmethod
+    def is_listener(penguin) -> bool:
+        """Bots don't count as an audience"""
+        return not getattr(penguin, 'is_bot', False)
+
+    def has_audience(self) -> bool:
+        """Checks the room still holds a real player and the speaker hasn't been moved"""
+        if self.room is None:  # debug conversations have no room
+            return True
+        if self.speaker is not None and self.speaker.room is not self.room:
+            return False
+        return any(self.is_listener(penguin) for penguin in self.room.penguins_by_id.values())
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Runs a coroutine as part of the conversation so it can be cancelled with it"""
+        task = asyncio.create_task(coro)
+        if self.cancelled:
+            task.cancel()
+            return task
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+        self.active.add(self)
+        if self._watchdog is None and self.room is not None:
+            self._watchdog = asyncio.create_task(self.watch())
+        return task
+
+    async def run(self, coro):
+        """Awaits a coroutine within the conversation, returning None if it was cancelled"""
+        try:
+            return await self.spawn(coro)
+        except asyncio.CancelledError:
+            if not self.cancelled:
+                raise
+
+    def _task_done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not self.tasks:
+            self.active.discard(self)
+            self.release()
+            if self._watchdog is not None:
+                self._watchdog.cancel()
+                self._watchdog = None
+
+    def release(self):
+        """Resets the talking flags of every participant"""
+        for b in self.participants:
+            if hasattr(b, 'talking'):
+                b.talking = False
+
+    async def watch(self):
+        """Polls the audience while the conversation has pending work"""
+        try:
+            while self.tasks:
+                await asyncio.sleep(self.check_interval)
+                if not self.has_audience():
+                    self.cancel()
+        except asyncio.CancelledError:
+            pass
+
+    def cancel(self):
+        """Aborts queued and in-flight generations and releases the participants"""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        room_id = self.room.id if self.room else None
+        logger.info(f"Conversation in room {room_id} cancelled: no audience left")
+        for task in list(self.tasks):
+            task.cancel()
+        self.release()
+        self.active.discard(self)
+
+    @classmethod
+    def audit(cls):
+        """Re-checks every active conversation, called when penguins leave or move rooms"""
+        for conversation in list(cls.active):
+            if not conversation.has_audience():
+                conversation.cancel()
+
+################################################################
+
 class Ollama:
     """Class for handling Ollama model interactions"""
     
     queue = asyncio.Queue()  # Asynchronous FIFO Queue
     session = None
+    pool = BackendPool(["http://ollama:11434"])  # Each backend fails fast while down or loading
+    breaker_fallback = True  # Answer with a persona's 'unavailable' intent while every backend is down
+    cache = ResponseCache()  # Shared across personas, keyed by (persona, load level, model, normalized prompt)
+    policy = LoadPolicy()  # Generation budget under load
 
     @classmethod
     def initialize_session(cls):
@@ -42,10 +146,10 @@ class Ollama:
 
     def __init__(self, model_name, **kwargs):
         self.custom_model = model_name.replace(" ", "_")
-        self.api_url = "http://ollama:11434/api/generate"
+        self.backend = None  # Sticky for the conversation, keeping the persona's model loaded on one host
         self.initialize_session()
         self.kwargs = kwargs  # Custom Parameters
-        logger.info(f"Initialized model: {self.custom_model}, API: {self.api_url}, kwargs: {self.kwargs}")
+        logger.info(f"Initialized model: {self.custom_model}, API: {self.pool}, kwargs: {self.kwargs}")
 
     @classmethod
     async def push(cls, item):
@@ -57,40 +161,77 @@ class Ollama:
         """Logs the current state of the queue"""
         queue_size = cls.queue.qsize()
         contents = list(cls.queue._queue)
-        logger.debug(f"({model_name}) - Queue size: {queue_size}, Contents: {contents}")
+        logger.debug(f"({model_name}) - Queue size: {queue_size}, Contents: {contents}, Cache: {cls.cache.stats()}")
+
+    async def generate(self, message: str = "", cached: bool = True, **kwargs):
+        """Generates a response, reusing cached responses for identical prompts to the same persona"""
+        if not cached or kwargs:
+            return await self.request(message, **kwargs)
+
+        # Responses trimmed or answered by the fallback model under load are only reused at that same load level
+        key = (self.custom_model, self.policy.level, self.policy.model(), IntentMatcher.normalize(message))
+        return await self.cache.fetch(key, lambda: self.request(message))
+
+    async def request(self, message: str = "", **kwargs):
+        """Requests a response from the Ollama model"""
+        backend = self.backend = self.pool.route(self.backend)
+        if backend is None:
+            logger.info(f"Every backend circuit is open, skipping {self.custom_model}")
+            return ""
 
-    async def generate(self, message: str = "", **kwargs):
-        """Generates a response using the Ollama model"""
         payload = {'model': self.custom_model, 'prompt': message, **self.kwargs, **kwargs}
-        logger.info(f"payload: {payload}")
+
+        if (options := self.policy.options()):
+            payload['options'] = {**options, **payload.get('options', {})}
+
+        if (fallback := self.policy.model()): # smaller model, persona sent as the system prompt
+            payload['model'] = fallback
+            payload['system'] = PersonaFileCreator.personas.get(self.custom_model.replace("_", " "), "")
+
+        logger.info(f"payload: {payload} -> {backend.host}")
         complete_response = ""
+        served = None  # seconds Ollama reports spending on the request, once it has taken a slot
+        started = now()
+        backend.outstanding += 1
         
         try:
-            async with self.session.post(self.api_url, json=payload, timeout=10) as response:
+            async with self.session.post(backend.api_url, json=payload, timeout=10) as response:
                 if response.status == 200:
                     async for token in response.content:
                         if token:
                             j = json.loads(token.decode('utf-8'))
                             complete_response += j.get("response", "")
                             if j.get("done", True):
+                                if 'total_duration' in j:
+                                    served = j['total_duration'] / 1e9
                                 break
+                    backend.breaker.record_success()
                 else:
                     logger.error(f"Error: Received status code {response.status}")
+                    backend.breaker.record_failure()
         except aiohttp.ClientConnectorError:
             logger.error(f"{self.custom_model} is unavailable.")
+            backend.breaker.record_failure()
         except asyncio.TimeoutError:
             logger.error("Request timed out.")
+            backend.breaker.record_failure()
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
+            backend.breaker.record_failure()
+        finally:
+            backend.outstanding -= 1
 
+        elapsed = now() - started
+        wait = elapsed if served is None else max(0.0, elapsed - served) # time spent queued for an Ollama slot
+        self.policy.observe(wait, self.queue.qsize())
         return complete_response
 
-    async def recursive_call(self, sentences: str = "", respondees: list = [], response_obj: Optional[object] = None, recursion_depth: int = 0, debug: bool = False):
+    async def recursive_call(self, sentences: str = "", respondees: list = [], response_obj: Optional[object] = None, recursion_depth: int = 0, debug: bool = False, conversation: Optional[Conversation] = None):
         """Handles selecting a new respondee and calling recursively"""
 
         if debug:  
             other_respondents = [name for name in respondees if name != self.custom_model]
-            self.custom_model = random.choice(other_respondents)
+            self.custom_model = streams.conversation.choice(other_respondents)
 
         else:  
             other_respondents = [b for b in respondees if b != response_obj and b.called]
@@ -107,30 +248,43 @@ class Ollama:
 
             self.custom_model = nickname.replace(" ", "_")
 
-        max_recursion = random.randint(2, 4)
+        max_recursion = self.policy.max_recursion(streams.conversation.randint(2, 4))
         logger.info(f"Recursion : {recursion_depth} / {max_recursion}")
 
         if recursion_depth <= max_recursion:
-            await self.__call__(sentences, respondees, response_obj, recursion_depth + 1)
+            await self.__call__(sentences, respondees, response_obj, recursion_depth + 1, conversation=conversation)
 
-    async def __call__(self, message: str = "", respondees: list = [], response_obj: Optional[object] = None, recursion_depth: int = 0, max_recursion: int = 3, debug: bool = False, **kwargs):
+    async def __call__(self, message: str = "", respondees: list = [], response_obj: Optional[object] = None, recursion_depth: int = 0, max_recursion: int = 3, debug: bool = False, conversation: Optional[Conversation] = None, **kwargs):
 
         if recursion_depth > max_recursion:
             logger.info(f"Max recursion depth reached: {max_recursion}")
             return
 
+        conversation = conversation or Conversation()
+        conversation.speaker = response_obj
+
+        if not conversation.has_audience():
+            return conversation.cancel()
+
+        if not self.pool.allow():
+            return logger.info("Every backend circuit is open, ending conversation")
+
         await self.push(message)
         await self.debug_queue(f"{self.custom_model} started processing")
 
-        sentences = await self.generate(message, **kwargs)
+        try:
+            sentences = await self.generate(message, cached=recursion_depth == 0, **kwargs) # follow-ups are rarely repeated
+        finally:  # a cancelled generation still leaves the queue
+            await self.queue.get()
+            self.queue.task_done()
+            await self.debug_queue(f"{self.custom_model} finished processing")
 
-        await self.queue.get()
-        self.queue.task_done()
-        await self.debug_queue(f"{self.custom_model} finished processing")
+        if not sentences:
+            return logger.info(f"{self.custom_model} generated no response")
 
         logger.info(f"{self.custom_model} generated response")
 
-        task = asyncio.create_task(respond(self, respondees, self.custom_model, response_obj, sentences, recursion_depth, debug=debug))
+        task = conversation.spawn(respond(self, respondees, self.custom_model, response_obj, sentences, recursion_depth, debug=debug, conversation=conversation))
         if debug:
             await task
 
@@ -144,7 +298,7 @@ async def handle_emoticon(b, response: str):
 
     async def send_emote(b, emote: int):
         logger.info(f"Sending emote: {emote}")
-        await b.room.send_xt('se', b.id, emote)
+        await b.send_room('se', b.id, emote)
 
     def load_emoticons(file_name: str):
         """Loads emoticon data from a file"""
@@ -188,7 +342,7 @@ async def retrieve_respondee(queryer_obj, participants, message, debug: bool = F
                 nickname = response_obj.nickname
   
         if debug == True:
-            nickname = random.choice(participants)
+            nickname = streams.conversation.choice(participants)
 
         return nickname, response_obj
 
@@ -200,15 +354,25 @@ async def send_PST(response_obj, participants, debug):
         T = f"It's currently {await PST()}"
         logger.info(T)
         if debug == False:
-            await response_obj.room.send_xt('sm', response_obj.id, T)
+            await response_obj.send_room('sm', response_obj.id, T)
             for b in participants: 
                 b.talking = False
 
+async def send_canned(response_obj, participants, response: str, debug):
+        """Sends a canned intent response instead of generating one"""
+        logger.info(f"Canned response: {response}")
+        if debug == False:
+            for sentence in await retrieve_sentences(response):
+                await response_obj.send_room('sm', response_obj.id, sentence)
+            await handle_emoticon(response_obj, response)
+            for b in participants:
+                b.talking = False
+
 async def do_sample(participants: list):
     """Randomly samples participants and marks them as talking"""
     if len(participants) >= 1:
         if len(participants) >= 3:
-            selected = random.sample(participants, random.randint(3, len(participants)))  # Randomly sample
+            selected = streams.conversation.sample(participants, streams.conversation.randint(3, len(participants)))  # Randomly sample
         else:
             selected = participants
         for p in participants:
@@ -227,11 +391,23 @@ async def new_conversation(message: str = "", participants: list = [], p: Option
     if any(query in message.lower() for query in {"what's the time", "tell me the time"}): # handle Penguin Time queries
         return await send_PST(response_obj, participants, debug)
 
-    await Ollama(model_name=nickname)(message, participants, response_obj, debug=debug)
+    if (canned := IntentMatcher.match(nickname, message, p.nickname if p else "")): # small talk skips the LLM
+        return await send_canned(response_obj, participants, canned, debug)
+
+    if not Ollama.pool.allow() or not governor.stage.conversations: # don't queue behind backends that are down or an overloaded world
+        if Ollama.breaker_fallback and (canned := IntentMatcher.fallback(nickname, p.nickname if p else "")):
+            return await send_canned(response_obj, participants, canned, debug)
+        if debug == False:
+            for b in participants:
+                b.talking = False
+        return logger.info(f"Ollama is unavailable or shedding load, {nickname} stays quiet")
+
+    conversation = Conversation(p.room if p else None, participants, p)
+    await conversation.run(Ollama(model_name=nickname)(message, participants, response_obj, debug=debug, conversation=conversation))
 
 ####################################################################################################
 
-async def respond(ollama, respondees, nickname, response_obj, raw_response, recursion_depth, debug: bool = False):
+async def respond(ollama, respondees, nickname, response_obj, raw_response, recursion_depth, debug: bool = False, conversation: Optional[Conversation] = None):
 
     sentences = await retrieve_sentences(raw_response)
 
@@ -242,12 +418,12 @@ async def respond(ollama, respondees, nickname, response_obj, raw_response, recu
             if word in greetings:
                 logger.info(f"wave is valid: '{word}'")
                 response_obj.frame = 25
-                return await response_obj.room.send_xt('sf', response_obj.id, response_obj.frame)
+                return await response_obj.send_room('sf', response_obj.id, response_obj.frame)
  
     async def send_response(sentence):
         logger.info(f"{nickname}: {sentence}")
         if response_obj:
-            await response_obj.room.send_xt('sm', response_obj.id, sentence) # send message to room
+            await response_obj.send_room('sm', response_obj.id, sentence) # send message to room
             await check_for_wave(sentence)
         await asyncio.sleep(min(1.0 + len(sentence) * 0.05, 5.0))
 
@@ -265,7 +441,7 @@ async def respond(ollama, respondees, nickname, response_obj, raw_response, recu
     if response_obj:
         response_obj.talking = False
 
-    await ollama.recursive_call(raw_response, respondees, response_obj, recursion_depth, debug=debug)
+    await ollama.recursive_call(raw_response, respondees, response_obj, recursion_depth, debug=debug, conversation=conversation)
 
 #################################################################################################### DEBUG
 
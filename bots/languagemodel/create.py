@@ -10,6 +10,7 @@ from . import logger
 class PersonaFileCreator:
     
     personas = {}
+    intents = {}
 
     @classmethod
     def load_personas(cls):
@@ -17,6 +18,15 @@ class PersonaFileCreator:
             _personas_path = os.path.join(os.path.dirname(__file__), 'personas.json')
             with open(_personas_path) as f:
                 cls.personas = json.load(f)
+        cls.load_intents()
+
+    @classmethod
+    def load_intents(cls):
+        """Loads each persona's canned intents, answered without calling Ollama"""
+        if not cls.intents:
+            _intents_path = os.path.join(os.path.dirname(__file__), 'intents.json')
+            with open(_intents_path) as f:
+                cls.intents = json.load(f)
 
     @classmethod
     def build_models(cls):
@@ -0,0 +1,83 @@
+# Standard Imports
+import re
+from typing import Optional
+
+# External Imports
+from fuzzywuzzy import fuzz
+
+# Package Imports
+from ..rng import streams
+from . import logger
+from .create import PersonaFileCreator
+
+class IntentMatcher:
+    """Fuzzy matches common small talk against each persona's canned responses"""
+
+    score_cutoff = 85  # minimum fuzz.ratio for a fuzzy hit
+    compiled = {}  # persona -> (exact pattern lookup, [(pattern, responses)])
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Lowercases, drops punctuation and collapses whitespace"""
+        return " ".join(re.sub(r"[^\w\s]", "", message.lower()).split())
+
+    @classmethod
+    def compile(cls):
+        """Expands every persona's patterns once so matching is a lookup plus a short scan"""
+        PersonaFileCreator.load_intents()
+        cls.compiled = {}
+
+        for persona, intents in PersonaFileCreator.intents.items():
+            names = {persona.lower(), persona.lower().split()[0]}
+            exact, choices = {}, []
+
+            for intent in intents.values():
+                for pattern in intent["patterns"]:
+                    for name in names:
+                        key = cls.normalize(pattern.format(name=name))
+                        if key not in exact:
+                            exact[key] = intent["responses"]
+                            choices.append((key, intent["responses"]))
+
+            cls.compiled[persona] = (exact, choices)
+            logger.info(f"Compiled {len(choices)} intent patterns for {persona}")
+
+    @classmethod
+    def lookup(cls, persona: str, message: str) -> Optional[list]:
+        """Returns the matched intent's response variants, or None on a miss"""
+        if not cls.compiled:
+            cls.compile()
+
+        exact, choices = cls.compiled.get(persona.replace("_", " "), ({}, []))
+        query = cls.normalize(message)
+
+        if query in exact:
+            return exact[query]
+
+        best_score, best = cls.score_cutoff - 1, None
+        for pattern, responses in choices:
+            # fuzz.ratio can't exceed 200 * min / (sum of lengths), skip patterns that can't reach the cutoff
+            if 200 * min(len(query), len(pattern)) < best_score * (len(query) + len(pattern)):
+                continue
+            score = fuzz.ratio(query, pattern)
+            if score > best_score:
+                best_score, best = score, responses
+
+        return best
+
+    @classmethod
+    def match(cls, persona: str, message: str, player_name: str = "") -> Optional[str]:
+        """Picks a canned response for the message, formatted for the player"""
+        responses = cls.lookup(persona, message)
+        if responses:
+            return streams.conversation.choice(responses).format(player=player_name or "friend")
+        return None
+
+    @classmethod
+    def fallback(cls, persona: str, player_name: str = "") -> Optional[str]:
+        """Picks the persona's 'unavailable' response, used while Ollama is down"""
+        PersonaFileCreator.load_intents()
+        intent = PersonaFileCreator.intents.get(persona.replace("_", " "), {}).get("unavailable")
+        if intent and intent["responses"]:
+            return streams.conversation.choice(intent["responses"]).format(player=player_name or "friend")
+        return None
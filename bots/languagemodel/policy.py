@@ -0,0 +1,71 @@
+# Standard Imports
+from collections import deque
+from typing import Optional
+
+# Package Imports
+from ..clock import now as clock_now
+from . import logger
+
+class LoadPolicy:
+    """Shrinks generation budgets as requests queue longer for an Ollama slot, restoring them as the wait falls
+
+    The wait is a request's wall time minus the total_duration Ollama reports for it, i.e.
+    time queued behind OLLAMA_NUM_PARALLEL slots and in transit. Requests that fail before
+    Ollama answers count their whole wall time.
+    """
+
+    # (num_predict, max recursion, use fallback model) per load level, -1 disables follow-ups
+    LEVELS = [
+        (None, None, False),
+        (96, 1, False),
+        (48, -1, True),
+    ]
+
+    def __init__(self, target_p95: float = 2.0, fallback_model: Optional[str] = None, window: int = 50, cooldown: float = 15.0):
+        self.target_p95 = target_p95  # p95 seconds of queue wait
+        self.fallback_model = fallback_model
+        self.cooldown = cooldown  # seconds between level changes
+        self.waits = deque(maxlen=window)
+        self.level = 0
+        self._changed = 0.0
+
+    def p95(self) -> float:
+        if not self.waits:
+            return 0.0
+        ordered = sorted(self.waits)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def observe(self, wait: float, queue_size: int = 0):
+        """Records a request's queue wait and steps the load level up or down"""
+        self.waits.append(wait)
+
+        now = clock_now()
+        if now - self._changed < self.cooldown:
+            return
+
+        p95 = self.p95()
+        level = self.level
+        if (p95 > self.target_p95 or queue_size > 1 and wait > self.target_p95) and level < len(self.LEVELS) - 1:
+            level += 1
+        elif p95 < self.target_p95 / 2 and level > 0:
+            level -= 1
+
+        if level != self.level:
+            logger.info(f"LLM load level {self.level} -> {level} (queue wait p95 {p95:.2f}s, target {self.target_p95}s, queue {queue_size})")
+            self.level = level
+            self._changed = now
+            self.waits.clear()  # judge the new level on its own requests
+
+    def options(self) -> dict:
+        """Ollama options for the current level"""
+        num_predict, _, _ = self.LEVELS[self.level]
+        return {'num_predict': num_predict} if num_predict else {}
+
+    def max_recursion(self, default: int) -> int:
+        _, cap, _ = self.LEVELS[self.level]
+        return default if cap is None else min(default, cap)
+
+    def model(self) -> Optional[str]:
+        """Returns the fallback model when the current level routes to it"""
+        _, _, fallback = self.LEVELS[self.level]
+        return self.fallback_model if fallback and self.fallback_model else None
@@ -0,0 +1,118 @@
+# Standard Imports
+import argparse
+import asyncio
+import json
+import random
+import time
+
+# External Imports
+from aiohttp import web
+
+# Package Imports
+from . import logger
+
+DEFAULT_TEXT = (
+    "Ahoy there, matey! The Migrator be anchored by the Beach, and Yarr be keeping watch from the crow's nest. "
+    "We sailed through a terrible storm last night, with waves as tall as the Ski Hill! "
+    "If ye fancy a treasure or two, come aboard and have a look in the hold."
+)
+
+class StandInServer:
+    """Local stand-in for Ollama's /api/generate, with configurable speed and failures"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11435, tokens_per_second: float = 30.0,
+                 latency: float = 0.3, jitter: float = 0.1, failure_rate: float = 0.0,
+                 parallel: int = 1, text: str = DEFAULT_TEXT, seed=None):
+        self.host = host
+        self.port = port
+        self.tokens_per_second = tokens_per_second
+        self.latency = latency  # mean seconds before the first token (prompt processing)
+        self.jitter = jitter  # standard deviation of the latency
+        self.failure_rate = failure_rate  # share of requests answered with a 500
+        self.parallel = asyncio.Semaphore(parallel)  # mirrors OLLAMA_NUM_PARALLEL
+        self.text = text
+        self.random = random.Random(seed)
+        self.queue_waits = []
+        self.requests = 0
+        self.failures = 0
+        self._runner = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def tokens(self, limit=None) -> list:
+        words = self.text.split(" ")
+        tokens = [w if i == 0 else " " + w for i, w in enumerate(words)]
+        return tokens[:limit] if limit else tokens
+
+    async def generate(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self.requests += 1
+
+        if self.random.random() < self.failure_rate:
+            self.failures += 1
+            return web.json_response({'error': 'injected failure'}, status=500)
+
+        queued = time.monotonic()
+        async with self.parallel:
+            started = time.monotonic()
+            self.queue_waits.append(started - queued)
+            await asyncio.sleep(max(0.0, self.random.gauss(self.latency, self.jitter)))
+
+            response = web.StreamResponse()
+            response.content_type = 'application/x-ndjson'
+            await response.prepare(request)
+
+            for token in self.tokens(payload.get('options', {}).get('num_predict')):
+                await asyncio.sleep(1 / self.tokens_per_second)
+                await response.write(json.dumps({'model': payload.get('model'), 'response': token, 'done': False}).encode() + b"\n")
+            total_duration = int((time.monotonic() - started) * 1e9)  # like Ollama, nanoseconds from taking a slot, queueing excluded
+            await response.write(json.dumps({'model': payload.get('model'), 'response': "", 'done': True,
+                                             'total_duration': total_duration}).encode() + b"\n")
+            await response.write_eof()
+            return response
+
+    async def tags(self, _: web.Request) -> web.Response:
+        return web.json_response({'models': [{'name': 'stand-in'}]})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/api/generate', self.generate)
+        app.router.add_get('/api/tags', self.tags)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Ollama stand-in listening on {self.url}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--tokens-per-second', type=float, default=30.0)
+    parser.add_argument('--latency', type=float, default=0.3, help="mean seconds before the first token")
+    parser.add_argument('--jitter', type=float, default=0.1, help="standard deviation of the latency")
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--parallel', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+
+def from_arguments(args: argparse.Namespace) -> StandInServer:
+    return StandInServer(args.host, args.port, args.tokens_per_second, args.latency, args.jitter,
+                         args.failure_rate, args.parallel, seed=args.seed)
+
+# python -m houdini.plugins.bots.languagemodel.standin --port 11434
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ollama stand-in server")
+    add_arguments(parser)
+
+    async def serve():
+        server = from_arguments(parser.parse_args())
+        await server.start()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
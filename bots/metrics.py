@@ -0,0 +1,196 @@
+import asyncio
+import functools
+import time
+from collections import Counter, defaultdict
+from typing import Optional
+
+from aiohttp import web
+
+from .clock import now
+
+
+class Histogram:
+    """HDR-style latency histogram over microseconds.
+
+    Values below 64us are counted exactly; above that each power of two is split into 32
+    linear sub-buckets, so any percentile is within ~3% of the true value and memory stays
+    bounded however many samples are recorded.
+    """
+
+    SUB_BUCKET_BITS = 6
+
+    def __init__(self):
+        self.counts = defaultdict(int)  # (shift, mantissa) -> samples
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        micros = max(0, int(seconds * 1_000_000))
+        shift = max(0, micros.bit_length() - self.SUB_BUCKET_BITS)
+        self.counts[shift, micros >> shift] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Seconds at or below which `q` percent of the samples fall."""
+        if not self.count:
+            return 0.0
+        target = max(1, round(self.count * q / 100))
+        seen = 0
+        for (shift, mantissa), samples in sorted(self.counts.items(), key=lambda b: b[0][1] << b[0][0]):
+            seen += samples
+            if seen >= target:
+                low, high = mantissa << shift, ((mantissa + 1) << shift) - 1
+                return min(self.max, (low + high) / 2 / 1_000_000)
+        return self.max
+
+    def snapshot(self) -> 'Histogram':
+        """A copy to diff against later with since()."""
+        copy = Histogram()
+        copy.counts.update(self.counts)
+        copy.count, copy.total, copy.max = self.count, self.total, self.max
+        return copy
+
+    def since(self, snapshot: 'Histogram') -> 'Histogram':
+        """The samples recorded after `snapshot` was taken (max is the all-time max)."""
+        if snapshot.count > self.count:  # metrics were reset in between
+            return self.snapshot()
+        delta = Histogram()
+        for bucket, samples in self.counts.items():
+            if samples > snapshot.counts.get(bucket, 0):
+                delta.counts[bucket] = samples - snapshot.counts.get(bucket, 0)
+        delta.count = self.count - snapshot.count
+        delta.total = self.total - snapshot.total
+        delta.max = self.max
+        return delta
+
+    def merge(self, other: 'Histogram'):
+        for bucket, samples in other.counts.items():
+            self.counts[bucket] += samples
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.mean * 1000, 3),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p90_ms': round(self.percentile(90) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class Metrics:
+    """Handler and bot action latencies, event loop lag and packets sent per room."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.handlers = defaultdict(Histogram)
+        self.actions = defaultdict(Histogram)
+        self.loop_lag = Histogram()
+        self.room_packets = Counter()
+        self.started = time.time()
+
+    def _timed(self, histograms: dict, function):
+        @functools.wraps(function)  # keeps the signature Houdini reads to convert packet arguments
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                histograms[function.__name__].record(time.perf_counter() - started)
+        return wrapper
+
+    def handler(self, function):
+        """Times a packet handler; goes directly above the function, under Houdini's decorators."""
+        return self._timed(self.handlers, function)
+
+    def action(self, function):
+        """Times a bot action."""
+        return self._timed(self.actions, function)
+
+    def count_packet(self, room_id: int):
+        self.room_packets[room_id] += 1
+
+    async def sample_loop_lag(self, interval: float = 0.5):
+        """Records how late the event loop wakes a sleep of `interval` seconds, forever."""
+        while True:
+            expected = now() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag.record(max(0.0, now() - expected))
+
+    def summary(self) -> dict:
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'loop_lag': self.loop_lag.summary(),
+            'handlers': {name: h.summary() for name, h in sorted(self.handlers.items())},
+            'actions': {name: h.summary() for name, h in sorted(self.actions.items())},
+            'room_packets': dict(self.room_packets.most_common()),
+        }
+
+    def exposition(self) -> str:
+        """The metrics in Prometheus' text format."""
+        lines = []
+
+        def summary(metric, histogram, labels=''):
+            for q in (50, 90, 99):
+                quantile = f'quantile="{q / 100}"'
+                lines.append(f'{metric}{{{labels + "," if labels else ""}{quantile}}} {histogram.percentile(q):.6f}')
+            labels = f'{{{labels}}}' if labels else ''
+            lines.append(f'{metric}_sum{labels} {histogram.total:.6f}')
+            lines.append(f'{metric}_count{labels} {histogram.count}')
+
+        lines.append('# TYPE bots_loop_lag_seconds summary')
+        summary('bots_loop_lag_seconds', self.loop_lag)
+        lines.append('# TYPE bots_handler_seconds summary')
+        for name, histogram in sorted(self.handlers.items()):
+            summary('bots_handler_seconds', histogram, f'handler="{name}"')
+        lines.append('# TYPE bots_action_seconds summary')
+        for name, histogram in sorted(self.actions.items()):
+            summary('bots_action_seconds', histogram, f'action="{name}"')
+        lines.append('# TYPE bots_room_packets_total counter')
+        for room_id, packets in sorted(self.room_packets.items()):
+            lines.append(f'bots_room_packets_total{{room="{room_id}"}} {packets}')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """Serves the metrics on a local port: Prometheus text at /metrics, JSON at /metrics.json."""
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9180):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def text(self, _: web.Request) -> web.Response:
+        return web.Response(text=self.metrics.exposition(), content_type='text/plain')
+
+    async def json(self, _: web.Request) -> web.Response:
+        return web.json_response(self.metrics.summary())
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self.text)
+        app.router.add_get('/metrics.json', self.json)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+metrics = Metrics()
@@ -1,7 +1,6 @@
 import asyncio
 import json
 import os
-import random
 import secrets
 
 from collections import defaultdict
@@ -22,8 +21,22 @@ from houdini.plugins import IPlugin
 
 from . import fantasynames as names
 from .bots import PenguinBot
-from .constants import ITEM_TYPE
+from .constants import ITEM_TYPE, ROOM_GEOMETRY
+from .pool import BotPool
+from .record import BotRecord
+from .rng import streams
+from .rotation import RotationScheduler
+from .schedule import Schedule
+from .spatial import SpatialIndex
+from .autoscaler import Autoscaler
+from .engine import create_engine
+from .governor import governor
+from .metrics import MetricsServer, metrics
+from .traffic import TrafficRecorder, TrafficReplayer
 from .languagemodel.create import PersonaFileCreator
+from .languagemodel.cache import ResponseCache
+from .languagemodel.policy import LoadPolicy
+from .languagemodel.backends import BackendPool
 from .languagemodel import converse
 
 
@@ -67,6 +80,8 @@ class BotPlugin(IPlugin):
     active_bots = []
     spawned = []
 
+    bot_class = PenguinBot  # swapped by the simulation harness for a bot without database access
+
     ENABLE_SPOT_LOCATIONS = True
     ENABLE_RANDOM_FRAME = True
     ENABLE_RANDOM_MOVEMENT = True
@@ -82,6 +97,8 @@ class BotPlugin(IPlugin):
         with open(self.config_file) as f:
             self.config: dict = json.load(f)
 
+        streams.configure(self.config.get('random_seed')) # a fixed seed replays the same bot behaviour
+
         self.dash_static_key = self.config.get('dash_static_key', 'houdini')
         self.email_domain = self.config.get('email_domain', 'email.com')
         self.active_rooms = self.config.get('active_rooms', self.room_ids)
@@ -90,10 +107,66 @@ class BotPlugin(IPlugin):
         self.rotation_enabled = True
         self.greeting_enabled = True
 
-        self.rotation_interval = range(60, 180)
+        self.rotation = RotationScheduler(self, concurrency=self.config.get('rotation_concurrency', 16)) # churn and interval set by apply_config
         self.beginning_population = 0
 
+        self.spatial = SpatialIndex(room_id for room_id, room in ROOM_GEOMETRY.rooms.items() if room.spots) # players near spots
+        self.pool = BotPool(self.config.get('bot_pool_size', 256)) # offline bots reused by rotation and populate
+        self.engine = create_engine(self) # optional NumPy engine for idle bot activity
+
+        self.recorder = TrafficRecorder(self.config.get('traffic_record_file'), self.server.logger) # player packets, for load test replays
+
         PersonaFileCreator.load_personas()
+        converse.Ollama.cache = ResponseCache(
+            maxsize=self.config.get('llm_cache_size', 512),
+            ttl=self.config.get('llm_cache_ttl', 600),
+            samples=self.config.get('llm_cache_samples', 3)
+        )
+        converse.Ollama.policy = LoadPolicy()
+        converse.Ollama.pool = BackendPool(
+            self.config.get('llm_backends', ["http://ollama:11434"]),
+            threshold=self.config.get('llm_breaker_threshold', 3),
+            probe_interval=self.config.get('llm_probe_interval', 5.0)
+        )
+        converse.Ollama.breaker_fallback = self.config.get('llm_breaker_fallback', True)
+
+        self.schedule = Schedule()
+        self.autoscaler = Autoscaler(self)
+        self.apply_config()
+
+        # on/off switches are read at startup only, '!bconfig governor' and '!bconfig autoscale' flip them at runtime
+        governor.enabled = self.config.get('governor_enabled', True)
+        self.autoscaler.enabled = self.config.get('autoscale_enabled', False)
+
+    def apply_config(self):
+        """Pushes the tunable settings in self.config into the components that use them."""
+        self.rotation.churn = self.config.get('rotation_churn_per_minute', 0.5)
+        self.rotation.interval = self.config.get('rotation_batch_interval', 30)
+
+        converse.Ollama.policy.target_p95 = self.config.get('llm_target_p95', 2.0)
+        converse.Ollama.policy.fallback_model = self.config.get('llm_fallback_model')
+
+        governor.lag_target = self.config.get('governor_lag_target', 0.05)
+        governor.handler_target = self.config.get('governor_handler_target', 2.0)
+
+        self.schedule.configure(
+            self.config.get('bot_rooms', self.room_ids),
+            population=self.config.get('population_schedule', {}),
+            room_weights=self.config.get('room_weights', {}),
+            profiles=self.config.get('room_profiles', {}),
+            profile_hours=self.config.get('room_profile_hours', {}),
+            timezone=self.config.get('schedule_timezone', 'America/Vancouver')
+        )
+
+        self.autoscaler.configure(
+            ratios=self.config.get('autoscale_ratios'),
+            minimum=self.config.get('autoscale_min', 5),
+            maximum=self.config.get('autoscale_max', 200),
+            step=self.config.get('autoscale_step', 10),
+            interval=self.config.get('autoscale_interval', 60),
+            lag_ceiling=self.config.get('autoscale_lag_ceiling', 0.05),
+            cpu_ceiling=self.config.get('autoscale_cpu_ceiling', 0.7)
+        )
 
     async def ready(self):
 
@@ -105,13 +178,24 @@ class BotPlugin(IPlugin):
         await self.register_permissions()
 
         existing_bots = await PenguinAttribute.select('penguin_id').where(PenguinAttribute.name == "BOT").gino.all()
-        self.accounts = await Penguin.query.where(Penguin.id.in_([b[0] for b in existing_bots])).gino.all()
+        accounts = await Penguin.select(*BotRecord.COLUMNS).where(Penguin.id.in_([b[0] for b in existing_bots])).gino.all()
+        self.accounts = [BotRecord(*account) for account in accounts] # full rows are loaded only for bots coming online
+        self.rotation.sync()
 
         asyncio.create_task(self.populate(self.beginning_population))
 
         if self.rotation_enabled:
             asyncio.create_task(self._rotation())
 
+        asyncio.create_task(self.autoscaler.run())
+        if self.engine:
+            asyncio.create_task(self.engine.run())
+        asyncio.create_task(metrics.sample_loop_lag(self.config.get('loop_lag_interval', 0.5)))
+        asyncio.create_task(governor.watch(self.server.logger)) # idles while disabled, so '!bconfig governor' can turn it on later
+        if self.config.get('metrics_port'):
+            await MetricsServer(metrics, port=self.config['metrics_port']).start()
+            self.server.logger.info(f"Serving bot metrics on port {self.config['metrics_port']} (/metrics, /metrics.json)")
+
     async def register_permissions(self):
         await self.server.permissions.register('bots.restyle')
         await self.server.permissions.register('bots.bpop')
@@ -119,35 +203,71 @@ class BotPlugin(IPlugin):
         await self.server.permissions.register('bots.spawn')
         await self.server.permissions.register('bots.brmv')
         await self.server.permissions.register('bots.bconfig')
+        await self.server.permissions.register('bots.brecord')
+        await self.server.permissions.register('bots.breplay')
+        await self.server.permissions.register('bots.bmetrics')
 
     async def populate(self, new_population: int):
+        async with self.rotation.lock: # rotation draws from the same offline accounts
+            await self._populate(new_population)
+
+    async def _populate(self, new_population: int):
 
         ACTIVE_COUNT = len(self.active_bots)
 
         if new_population < ACTIVE_COUNT:
-            # Remove bots to match the new population
-            bots_leaving = random.sample(self.active_bots, ACTIVE_COUNT - new_population)
+            # Remove bots to match the new population, leaving mascots to '!brmv'
+            candidates = [b for b in self.active_bots if not b.called]
+            bots_leaving = streams.rotation.sample(candidates, min(len(candidates), ACTIVE_COUNT - new_population))
+            self.rotation.left(bots_leaving)
             for BOT in bots_leaving:
                 await BOT.handle_disconnected()
                 self.active_bots.remove(BOT) # no need to update houdini population
         elif new_population > ACTIVE_COUNT:
             increase = new_population - ACTIVE_COUNT
-            bots_sample = random.sample(self.accounts, min(increase, len(self.accounts)))
+            bots_sample = [self.rotation.records[i] for i in self.rotation.offline.sample(increase, streams.rotation)]
 
             if len(bots_sample) < increase:
                 # Create additional bots
                 extra_accounts = increase - len(bots_sample)
                 new_bots = await self.create_bots(extra_accounts)
+                self.rotation.records.update((record.id, record) for record in new_bots)
                 bots_sample += new_bots
 
-            for BOT in [PenguinBot(b.id, self).load_data(b) for b in bots_sample]:
+            joining = await self.materialize(bots_sample)
+            for BOT in joining:
                 self.active_bots.append(BOT)
                 await BOT.initialize()
                 BOT.begin_activity()
+            self.rotation.joined(joining)
         else:
             return
         await self.update_houdini()
 
+    def reload_config(self):
+        """Re-reads config.json in place, so bots holding a reference to it see the new values.
+
+        Raises json.JSONDecodeError, leaving the running config untouched, if the file is invalid.
+        """
+        with open(self.config_file) as f:
+            config = json.load(f)
+        self.config.clear()
+        self.config.update(config)
+        self.apply_config()
+
+    async def materialize(self, records: list) -> list:
+        """Turns offline accounts into bots: pooled bots are reused, the rest load their rows in one query."""
+        bots, missing = [], []
+        for record in records:
+            if (bot := self.pool.acquire(record.id)):
+                bots.append(bot)
+            else:
+                missing.append(record)
+        if missing:
+            rows = await self.bot_class.fetch_rows([record.id for record in missing])
+            bots += [self.bot_class(row.id, self).load_data(row) for row in rows]
+        return bots
+
     async def update_houdini(self):
         await self.server.redis.hset('houdini.population', self.server.config.id, len(self.server.penguins_by_id)) 
         self.server.logger.info(f'Server {self.server.config.id} population: {len(self.server.penguins_by_id)}')
@@ -155,6 +275,9 @@ class BotPlugin(IPlugin):
     @commands.command('bpop')
     @permissions.has_or_moderator('bots.bpop')
     async def change_bots_population(self, p, new_population: int):
+        if self.autoscaler.enabled:
+            self.autoscaler.enabled = False # a manual population holds until '!bconfig autoscale'
+            p.logger.info("Autoscaling disabled by a manual population change")
         asyncio.create_task(self.populate(new_population))
 
     @commands.command('bpurge')
@@ -169,36 +292,30 @@ class BotPlugin(IPlugin):
             ids = [account.id for account in self.accounts]
             await Penguin.delete.where((Penguin.id.in_(ids)) & (Penguin.character == None)).gino.status()
             self.accounts = []
-
-    def random_name(self):
-        name_generators = [
-            names.elf,
-            names.dwarf,
-            names.hobbit,
-            names.french,
-            names.anglo,
-            names.human,
-        ]
-        random_name = random.choice(name_generators)()
-        self.server.logger.info(f"{random_name} has been created")
-        return random_name
+            self.pool.clear()
+            self.rotation.sync()
 
     async def create_bots(self, bots_needed: int):
 
-        existing_names = await Penguin.select('username').gino.all()
+        existing_names = {row[0] for row in await Penguin.select('username').gino.all()}
 
         password = self.config.get('bots_password') or secrets.token_urlsafe(32)
         hashed_password = self._hash_password(password)
 
-        unique_names = []
+        try: # drawn without replacement from the enumerated name spaces, keyed by the 12 character username
+            unique_names = names.sample_names(bots_needed, exclude=existing_names, warn=self.server.logger.warning)
+            self.server.logger.info(f"Name space capacity: {names.capacity(len(existing_names) + bots_needed)}")
+        except names.NameSpaceExhausted as e:
+            self.server.logger.warn(str(e))
+            unique_names = e.names
+
         bots = []
 
-        while len(unique_names) < bots_needed:
-            name = self.random_name()
-            if name not in existing_names and name not in unique_names:
-                unique_names.append(name)  
-                bots.append(await self.create_penguin_bot(name, hashed_password))
-                await asyncio.sleep(0.2)
+        for name in unique_names:
+            self.server.logger.info(f"{name} has been created")
+            if (bot := await self.create_penguin_bot(name, hashed_password)):
+                bots.append(bot)
+            await asyncio.sleep(0.2)
 
         return bots
  
@@ -208,7 +325,7 @@ class BotPlugin(IPlugin):
         hashed_password = Crypto.get_login_hash(hashed_password, rndk=self.dash_static_key)
         return bcrypt.hashpw(hashed_password.encode('utf-8'), bcrypt.gensalt(12)).decode('utf-8')   
 
-    async def create_penguin_bot(self, name: str, hashed_password: str) -> Penguin:
+    async def create_penguin_bot(self, name: str, hashed_password: str) -> BotRecord:
         """Create a single penguin and assign attributes, items, and inventory."""
         email = f'{name.lower()}@{self.email_domain}'
         return await self._create_penguin_in_db(name, email, hashed_password)
@@ -217,7 +334,7 @@ class BotPlugin(IPlugin):
         """Create the penguin in the database and assign attributes."""
         try:
             async with self.server.db.transaction():
-                color = random.randrange(2, 14)
+                color = streams.names.randrange(2, 14)
                 penguin = await Penguin.create(
                     username=name.lower()[:12], nickname=name, password=hashed_password,
                     email=email, color=int(color), approval_en=True, active=True
@@ -225,8 +342,9 @@ class BotPlugin(IPlugin):
                 await PenguinAttribute.create(penguin_id=penguin.id, name="BOT", value="true")
                 await PenguinItem.create(penguin_id=penguin.id, item_id=int(color))
                 await self.assign_clothing(penguin)
-                self.accounts.append(penguin)
-                return penguin
+                record = BotRecord.from_row(penguin)
+                self.accounts.append(record)
+                return record
         except Exception as e:
             self.server.logger.warn(f'Skipping creation of {name}: {e}')
             return None
@@ -234,14 +352,14 @@ class BotPlugin(IPlugin):
     async def assign_clothing(self, penguin):
         if self.has_inventory:
             await penguin.update(**{
-                'head': random.choice(self.items_categorized[ITEM_TYPE.HEAD]).id,
-                'face': random.choice(self.items_categorized[ITEM_TYPE.FACE]).id,
-                'neck': random.choice(self.items_categorized[ITEM_TYPE.NECK]).id,
-                'body': random.choice(self.items_categorized[ITEM_TYPE.BODY]).id,
-                'hand': random.choice(self.items_categorized[ITEM_TYPE.HAND]).id,
-                'feet': random.choice(self.items_categorized[ITEM_TYPE.FEET]).id,
-                'flag': random.choice(self.items_categorized[ITEM_TYPE.FLAG]).id,
-                'photo': random.choice(self.items_categorized[ITEM_TYPE.PHOTO]).id
+                'head': streams.names.choice(self.items_categorized[ITEM_TYPE.HEAD]).id,
+                'face': streams.names.choice(self.items_categorized[ITEM_TYPE.FACE]).id,
+                'neck': streams.names.choice(self.items_categorized[ITEM_TYPE.NECK]).id,
+                'body': streams.names.choice(self.items_categorized[ITEM_TYPE.BODY]).id,
+                'hand': streams.names.choice(self.items_categorized[ITEM_TYPE.HAND]).id,
+                'feet': streams.names.choice(self.items_categorized[ITEM_TYPE.FEET]).id,
+                'flag': streams.names.choice(self.items_categorized[ITEM_TYPE.FLAG]).id,
+                'photo': streams.names.choice(self.items_categorized[ITEM_TYPE.PHOTO]).id
             }).apply()
 
     async def _penguin(self, username: str):
@@ -280,7 +398,8 @@ class BotPlugin(IPlugin):
 
             p.logger.info(f"{p.nickname}: A rare {m.nickname} has appeared in {p.room.name}")
 
-            BOT = PenguinBot(m.id, self).load_data(m)
+            self.pool.discard(m.id) # the fresh row replaces any pooled copy
+            BOT = self.bot_class(m.id, self).load_data(m)
             BOT.called = True
 
             if m.username not in {BOT.username for BOT in self.accounts} or (m.id not in self.server.penguins_by_id):
@@ -291,9 +410,10 @@ class BotPlugin(IPlugin):
                     await PenguinAttribute.create(penguin_id=m.id, name="BOT", value="true")
 
                 await BOT.initialize()
-                self.accounts.append(BOT)
+                self.accounts.append(BotRecord.from_row(m))
                 self.active_bots.append(BOT)
                 self.spawned.append(BOT)
+                self.rotation.sync()
                 await self.update_houdini()
 
             await BOT.go_player_room(p, p.room)
@@ -318,6 +438,8 @@ class BotPlugin(IPlugin):
                     await self.update_houdini()
                     self.active_bots = [b for b in self.active_bots if b.id != m.id]
                     self.accounts = [b for b in self.accounts if b.id != m.id]
+                    self.pool.discard(m.id)
+                    self.rotation.sync()
                     await PenguinAttribute.delete.where(
                         (PenguinAttribute.penguin_id == m.id) & (PenguinAttribute.name == "BOT")
                     ).gino.status()
@@ -337,6 +459,26 @@ class BotPlugin(IPlugin):
             'random spots': 'ENABLE_SPOT_LOCATIONS',
             'random movements': 'ENABLE_RANDOM_MOVEMENT',
         }
+        if setting == 'reload':
+            try:
+                self.reload_config()
+            except json.JSONDecodeError as e:
+                return p.logger.info(f"config.json is invalid, kept the running config: {e}")
+            return p.logger.info(f"config reloaded: rotation, LLM load policy, governor targets, schedule "
+                                 f"({len(self.schedule.room_ids)} rooms) and autoscaler settings; "
+                                 f"the governor and autoscale switches keep their current state")
+        if setting.startswith('rooms'): # e.g. '!bconfig rooms 100 120 300'
+            room_ids = [int(x) for x in setting.split()[1:] if x.isdigit() and int(x) in self.server.rooms]
+            if room_ids:
+                self.config['bot_rooms'] = room_ids
+                self.schedule.configure(room_ids)
+            return p.logger.info(f"bots use rooms {self.schedule.room_ids}")
+        if setting == 'autoscale':
+            self.autoscaler.enabled = not self.autoscaler.enabled
+            return p.logger.info(f"autoscale is now {'enabled' if self.autoscaler.enabled else 'disabled'} (target {self.autoscaler.target})")
+        if setting == 'governor':
+            governor.enabled = not governor.enabled
+            return p.logger.info(f"governor is now {'enabled' if governor.enabled else 'disabled'} (stage {governor.level})")
         if setting in settings_map:
             attribute = settings_map[setting]
             setattr(self, attribute, not getattr(self, attribute))
@@ -344,87 +486,118 @@ class BotPlugin(IPlugin):
         else:
             p.logger.info(f"Setting '{setting}' Invalid. Available settings: {', '.join(settings_map.keys())}")
 
+    @commands.command('brecord')
+    @permissions.has_or_moderator('bots.brecord')
+    async def toggle_recording(self, p, path: str = ""):
+        if self.recorder.enabled and not path:
+            self.recorder.close()
+            p.logger.info(f"Stopped recording traffic to {self.recorder.path} ({self.recorder.recorded} packets)")
+            self.recorder = TrafficRecorder()
+        else:
+            self.recorder.close()
+            self.recorder = TrafficRecorder(path or self.config.get('traffic_record_file') or 'traffic.btr', self.server.logger)
+            p.logger.info(f"Recording traffic to {self.recorder.path}")
+
+    @commands.command('breplay')
+    @permissions.has_or_moderator('bots.breplay')
+    async def replay_traffic(self, p, path: str, speed: float = 1.0):
+        if self.recorder.enabled and os.path.abspath(path) == os.path.abspath(self.recorder.path):
+            return p.logger.info(f"{path} is still being recorded, stop recording with '!brecord' before replaying it")
+
+        async def replay():
+            replayer = TrafficReplayer(path, speed)
+            await replayer.replay(self)
+            p.logger.info(f"Replayed {replayer.replayed} packets from {path}, skipped {replayer.skipped}")
+
+        self.recorder.flush()
+        asyncio.create_task(replay())
+
+    @commands.command('bmetrics')
+    @permissions.has_or_moderator('bots.bmetrics')
+    async def show_metrics(self, p, reset: str = ""):
+        summary = metrics.summary()
+        p.logger.info(f"Loop lag: {summary['loop_lag']}")
+        for name, latency in {**summary['handlers'], **summary['actions']}.items():
+            p.logger.info(f"{name}: {latency}")
+        busiest = ', '.join(f"{room_id}: {packets}" for room_id, packets in list(summary['room_packets'].items())[:10])
+        p.logger.info(f"Packets sent per room: {busiest}")
+        if reset == 'reset':
+            metrics.reset()
+
     async def _rotation(self):
         """Rotate bots in and out of the game periodically."""
-        while True:
-            await asyncio.sleep(random.choice(self.rotation_interval))
-            await self._rotate_active_bots()
-
-    async def _rotate_active_bots(self):
-        """Handles disconnects and reconnects bots - replacing active bots."""
-        if len(self.accounts) > 2 and len(self.active_bots) > 2:
-            bots_can_join = [BOT for BOT in self.accounts if BOT.id not in self.server.penguins_by_id]
-            
-            if not bots_can_join:
-                self.server.logger.info("No available bots to join. Skipping rotation.")
-                return
-            
-            b_joining = random.choice(bots_can_join)
-            b_joining = PenguinBot(b_joining.id, self).load_data(b_joining)
-            
-            bots_can_leave = [BOT for BOT in self.active_bots if not BOT.called]
-
-            if not bots_can_leave:
-                self.server.logger.info("No active bots can leave.")
-                return
-
-            b_leaving = random.choice(bots_can_leave)
-            self.active_bots = [bot for bot in self.active_bots if bot.id != b_leaving.id]
-            await b_leaving.handle_disconnected()
-            await b_joining.initialize()
-            b_joining.begin_activity()
-            self.active_bots.append(b_joining)
+        await self.rotation.run()
 
     def being_followed(self, p, b):
         return b.following_penguin is not None and b.following_penguin.id == p.id
 
     @handlers.handler(XTPacket('j', 'jr'))
-    async def on_player_join_room(self, p, room: Room, *_):
+    @metrics.handler
+    async def on_player_join_room(self, p, room: Room, x: int, y: int, *_):
         """Handle bots joining - finding players and greeting players"""
+        self.recorder.record('j#jr', p, room, x, y)
+        self.spatial.move(p, room.id, x, y) # p.x and p.y may not be updated yet
+        converse.Conversation.audit() # the player may have left a conversation's room
         Tasks = []
         for b in self.active_bots:
             if self.being_followed(p,b):
                 Tasks.append(b.go_player_room(p, room))
-            elif p.room.id == b.room.id and self.greeting_enabled and len(p.room.penguins_by_id) < 4 and not b.called:
+            elif p.room.id == b.room.id and self.greeting_enabled and governor.stage.reactions and len(p.room.penguins_by_id) < 4 and not b.called:
                 Tasks.append(b.give_greeting())
         if Tasks:
-            await asyncio.gather(*Tasks)
+            asyncio.create_task(self._react(Tasks))
 
     @handlers.handler(XTPacket('u', 'sp'))
+    @metrics.handler
     async def handle_player_movements(self, p, x: int, y: int):
+        self.recorder.record('u#sp', p, x, y)
+        if p.room:
+            self.spatial.move(p, p.room.id, x, y)
         Tasks = []
         for b in self.active_bots:
             if p.room and b.room and self.being_followed(p,b) and p.room.id == b.room.id:
                 Tasks.append(b.goto_coordinates(p, x, y))
         if Tasks:
-            await asyncio.gather(*Tasks)
+            asyncio.create_task(self._react(Tasks))
 
     @handlers.handler(XTPacket('u', 'sb'))
+    @metrics.handler
     async def handle_player_snowball(self, p, x: int, y: int):
         """Handle bots reacting to snowball"""
-        await asyncio.gather(*(bot.handle_snowball(p, x, y) for bot in self.active_bots))
+        self.recorder.record('u#sb', p, x, y)
+        asyncio.create_task(self._react([bot.handle_snowball(p, x, y) for bot in self.active_bots]))
 
     @handlers.handler(XTPacket('u', 'ss'))
+    @metrics.handler
     async def handle_player_safe_message(self, p, message_id: int):
         """Handle bots reacting to safe messages."""
-        await asyncio.gather(*(bot.handle_safe_message(p, message_id) for bot in self.active_bots))
+        self.recorder.record('u#ss', p, message_id)
+        asyncio.create_task(self._react([bot.handle_safe_message(p, message_id) for bot in self.active_bots]))
 
     @handlers.handler(XTPacket('jw', ext='z'))
+    @metrics.handler
     async def handle_player_join_waddle(self, p, waddle_id: int): # sled racing
+        self.recorder.record('jw', p, waddle_id)
         if waddle_id not in p.room.waddles:
             return
         waddle: RoomWaddle = p.room.waddles[waddle_id]
 
         try:
-            bots_chosen = random.sample(self.active_bots, waddle.seats - 1)
-            await asyncio.gather(*(bot.enter_waddle(p, waddle) for bot in bots_chosen))
+            bots_chosen = streams.movement.sample(self.active_bots, waddle.seats - 1)
+            asyncio.create_task(self._react([bot.enter_waddle(p, waddle) for bot in bots_chosen]))
 
         except ValueError:
             self.server.logger.error("More bots are needed to join a session")
 
+    async def _react(self, reactions: list):
+        """Bot reactions run outside the handler, so their deliberate delays aren't counted as handler time."""
+        await asyncio.gather(*reactions)
+
     @handlers.handler(XTPacket('m', 'sm'))
     @handlers.cooldown(.5)
+    @metrics.handler
     async def handle_LLM_query(self, p, _id: int, message: str):
+        self.recorder.record('m#sm', p, _id, message)
 
         if _id != p.id:
             return await p.close()
@@ -463,7 +636,7 @@ class BotPlugin(IPlugin):
                 if participants:
                     sample_participants = await converse.do_sample(participants)
                     p.logger.info(f"sample participants {[s.nickname for s in sample_participants]}")
-                    await converse.new_conversation(message, sample_participants, p)    
+                    asyncio.create_task(converse.new_conversation(message, sample_participants, p)) # LLM round trips aren't handler time
 
         except UnknownCommandException as e:
             self.server.logger.error(f"UnknownCommandException: {e}")
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .bots import PenguinBot
+
+
+class BotPool:
+    """Offline PenguinBots kept for reuse, least recently used evicted past `maxsize`.
+
+    A pooled bot keeps its penguin data and igloo collection, so bringing it back online
+    skips the penguin row query and the igloo round trips.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.bots = OrderedDict()  # penguin id -> offline PenguinBot
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.bots)
+
+    def __contains__(self, penguin_id: int) -> bool:
+        return penguin_id in self.bots
+
+    def release(self, bot: 'PenguinBot'):
+        if self.maxsize <= 0:
+            return
+        self.bots[bot.id] = bot
+        self.bots.move_to_end(bot.id)
+        while len(self.bots) > self.maxsize:
+            self.bots.popitem(last=False)
+
+    def acquire(self, penguin_id: int) -> Optional['PenguinBot']:
+        bot = self.bots.pop(penguin_id, None)
+        if bot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        bot.reset()
+        return bot
+
+    def discard(self, penguin_id: int):
+        self.bots.pop(penguin_id, None)
+
+    def clear(self):
+        self.bots.clear()
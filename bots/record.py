@@ -0,0 +1,29 @@
+class BotRecord:
+    """What the plugin keeps about a bot account while it's offline.
+
+    Only a materialised PenguinBot carries the full penguin row, since Houdini reads every
+    column when the bot joins a room or sits in penguins_by_id. Offline accounts are just
+    these three fields until rotation or populate brings them online.
+    """
+
+    __slots__ = ('id', 'username', 'nickname')
+
+    COLUMNS = ('id', 'username', 'nickname')  # selected instead of the whole row when loading accounts
+
+    def __init__(self, penguin_id: int, username: str, nickname: str):
+        self.id = penguin_id
+        self.username = username
+        self.nickname = nickname
+
+    @classmethod
+    def from_row(cls, row) -> 'BotRecord':
+        return cls(row.id, row.username, row.nickname)
+
+    def __eq__(self, other):
+        return isinstance(other, BotRecord) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'BotRecord({self.id}, {self.username!r})'
@@ -0,0 +1,29 @@
+import random
+from typing import Hashable, Optional
+
+from .fantasynames.language import Language
+
+
+class RandomStreams:
+    """Seedable random streams, one per subsystem, so simulation runs can be replayed."""
+
+    SUBSYSTEMS = ('movement', 'names', 'rotation', 'conversation')
+
+    def __init__(self, seed: Optional[int] = None):
+        self.configure(seed)
+
+    def configure(self, seed: Optional[int] = None):
+        """Reseeds every stream. With no seed the streams are unpredictable, as before."""
+        self.seed = seed
+        for subsystem in self.SUBSYSTEMS:
+            setattr(self, subsystem, self.spawn(subsystem))
+        Language.rng = self.names
+
+    def spawn(self, subsystem: str, key: Hashable = None) -> random.Random:
+        """A stream derived from the seed, e.g. one per bot so scheduling order doesn't change its draws."""
+        if self.seed is None:
+            return random.Random()
+        return random.Random(f"{self.seed}:{subsystem}:{key}")
+
+
+streams = RandomStreams()
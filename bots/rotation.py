@@ -0,0 +1,129 @@
+import asyncio
+from typing import TYPE_CHECKING, Hashable
+
+from .governor import governor
+from .rng import streams
+
+if TYPE_CHECKING:
+    from houdini.plugins.bots import BotPlugin
+
+
+class IndexedSet:
+    """A set that can also sample k members in O(k): a list plus each member's position in it."""
+
+    def __init__(self, members=()):
+        self.members = []
+        self.positions = {}
+        for member in members:
+            self.add(member)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, member: Hashable) -> bool:
+        return member in self.positions
+
+    def add(self, member: Hashable):
+        if member not in self.positions:
+            self.positions[member] = len(self.members)
+            self.members.append(member)
+
+    def discard(self, member: Hashable):
+        position = self.positions.pop(member, None)
+        if position is None:
+            return
+        last = self.members.pop()
+        if position < len(self.members):  # swap the last member into the hole
+            self.members[position] = last
+            self.positions[last] = position
+
+    def sample(self, k: int, rng) -> list:
+        return [self.members[i] for i in rng.sample(range(len(self.members)), min(k, len(self.members)))]
+
+
+class RotationScheduler:
+    """Swaps bots in and out at a steady churn rate, a batch at a time.
+
+    Online and offline accounts are kept as indexed sets, updated as bots join and leave, so
+    picking a batch costs the same however many bots there are. Each batch's leaves and joins
+    run concurrently, bounded by `concurrency`. `lock` is shared with populate, so the two never
+    draw the same offline accounts.
+    """
+
+    def __init__(self, plugin: 'BotPlugin', churn: float = 0.5, interval: float = 30.0, concurrency: int = 16):
+        self.plugin = plugin
+        self.churn = churn  # bots swapped per minute
+        self.interval = interval  # seconds between batches
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()  # held while the active bots change
+        self.online = IndexedSet()  # ids of bots that rotation may take offline
+        self.offline = IndexedSet()  # ids of accounts that may come online
+        self.records = {}  # account id -> BotRecord
+        self._carry = 0.0  # fractional swaps owed from earlier batches
+        self.swapped = 0
+
+    def sync(self):
+        """Rebuilds the sets from the plugin, after changes made outside rotation and populate."""
+        self.records = {record.id: record for record in self.plugin.accounts}
+        active = {bot.id for bot in self.plugin.active_bots if not bot.called}
+        online = self.plugin.server.penguins_by_id
+        self.online = IndexedSet(active)
+        self.offline = IndexedSet(i for i in self.records if i not in online)
+
+    def joined(self, bots: list):
+        for bot in bots:
+            self.offline.discard(bot.id)
+            if not bot.called:
+                self.online.add(bot.id)
+
+    def left(self, bots: list):
+        for bot in bots:
+            self.online.discard(bot.id)
+            if bot.id in self.records:
+                self.offline.add(bot.id)
+
+    def batch_size(self) -> int:
+        self._carry += self.churn * self.interval / 60
+        size = int(self._carry)
+        self._carry -= size
+        return size
+
+    async def _bounded(self, coroutine):
+        async with self.semaphore:
+            return await coroutine
+
+    async def rotate(self, size: int):
+        async with self.lock:
+            await self._rotate(size)
+
+    async def _rotate(self, size: int):
+        size = min(size, len(self.online), len(self.offline))
+        if size <= 0:
+            return
+
+        plugin = self.plugin
+        rng = streams.rotation
+        by_id = {bot.id: bot for bot in plugin.active_bots}
+        leaving = [by_id[i] for i in self.online.sample(size, rng) if i in by_id]
+        joining = await plugin.materialize([self.records[i] for i in self.offline.sample(size, rng)])
+
+        leaving_ids = {bot.id for bot in leaving}
+        plugin.active_bots = [bot for bot in plugin.active_bots if bot.id not in leaving_ids]
+        self.left(leaving)
+        await asyncio.gather(*(self._bounded(bot.handle_disconnected()) for bot in leaving))
+
+        await asyncio.gather(*(self._bounded(bot.initialize()) for bot in joining))
+        for bot in joining:
+            bot.begin_activity()
+        plugin.active_bots.extend(joining)
+        self.joined(joining)
+
+        self.swapped += len(joining)
+        plugin.server.logger.info(f"Rotated {len(leaving)} bots out and {len(joining)} in")
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            size = self.batch_size()
+            if governor.stage.rotation:  # paused while the governor sheds load
+                await self.rotate(size)
@@ -0,0 +1,140 @@
+import bisect
+import datetime
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import pytz
+
+from .clock import now
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted draw."""
+
+    def __init__(self, items: Sequence[Hashable], weights: Sequence[float]):
+        self.items = list(items)
+        n = len(self.items)
+        total = float(sum(weights))
+        if not n or total <= 0:
+            raise ValueError("an alias table needs at least one positive weight")
+
+        self.probability = [0.0] * n
+        self.alias = list(range(n))
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.probability[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:  # leftovers are 1 up to rounding
+            self.probability[i] = 1.0
+
+    def __len__(self):
+        return len(self.items)
+
+    def sample(self, rng, exclude: Hashable = None, attempts: int = 32):
+        """A weighted draw; `exclude` is rejected and redrawn, so excluding stays O(1) on average."""
+        n = len(self.items)
+        for _ in range(attempts):
+            column = int(rng.random() * n)
+            item = self.items[column] if rng.random() < self.probability[column] else self.items[self.alias[column]]
+            if item != exclude:
+                return item
+        others = [item for item in self.items if item != exclude]  # `exclude` carries nearly all the weight
+        return rng.choice(others) if others else exclude
+
+
+def _curve(points: Optional[Dict[str, float]]) -> tuple:
+    points = points or {}
+    hours = sorted(int(hour) for hour in points)
+    return hours, [points[str(hour)] for hour in hours]
+
+
+class Schedule:
+    """Time-of-day population targets and room weight profiles.
+
+    Population targets are interpolated between the configured hours, wrapping past
+    midnight. Each room profile's alias table is built the first time the profile is
+    used and reused until the profile changes or configure() changes the rooms or weights.
+    """
+
+    PROFILE_CHECK_INTERVAL = 60.0  # seconds the current profile is cached for
+
+    def __init__(self, room_ids: Sequence[int] = (), population: Dict[str, int] = None,
+                 room_weights: Dict[str, float] = None, profiles: Dict[str, Dict[str, float]] = None,
+                 profile_hours: Dict[str, str] = None, timezone: str = 'America/Vancouver'):
+        self.population_hours, self.population_targets = _curve(population)
+        self.timezone = pytz.timezone(timezone)  # Penguin Standard Time by default
+        self.tables = {}  # profile -> AliasTable over room_ids
+        self.room_ids = []
+        self.room_weights = {}  # base weights, which profiles override per room
+        self.profiles = {}
+        self.profile_hours, self.profile_names = [], []
+        self.configure(room_ids, room_weights or {}, profiles or {}, profile_hours or {})
+
+    def configure(self, room_ids: Sequence[int] = None, room_weights: Dict[str, float] = None,
+                  profiles: Dict[str, Dict[str, float]] = None, profile_hours: Dict[str, str] = None,
+                  population: Dict[str, int] = None, timezone: str = None):
+        """Replaces the given settings and drops the alias tables built from the old ones."""
+        if population is not None:
+            self.population_hours, self.population_targets = _curve(population)
+        if timezone is not None:
+            self.timezone = pytz.timezone(timezone)
+        if room_ids is not None:
+            self.room_ids = list(room_ids)
+        if room_weights is not None:
+            self.room_weights = room_weights
+        if profiles is not None:
+            self.profiles = profiles
+        if profile_hours is not None:
+            self.profile_hours, self.profile_names = _curve(profile_hours)
+        self.invalidate()
+
+    def invalidate(self):
+        self.tables.clear()
+        self._profile = (float('-inf'), None)  # (checked at, profile)
+
+    def hour(self) -> float:
+        local = datetime.datetime.now(self.timezone)
+        return local.hour + local.minute / 60
+
+    def population(self, hour: float = None) -> Optional[int]:
+        """The bot population wanted at `hour`, None without a population curve."""
+        hours, targets = self.population_hours, self.population_targets
+        if not hours:
+            return None
+        hour = self.hour() if hour is None else hour
+
+        i = bisect.bisect_right(hours, hour) - 1  # -1 wraps to the last point of the previous day
+        start, end = hours[i] - (24 if i < 0 else 0), hours[(i + 1) % len(hours)]
+        if end <= start:
+            end += 24
+        share = (hour - start) / (end - start) if end != start else 0.0
+        return round(targets[i] + (targets[(i + 1) % len(hours)] - targets[i]) * share)
+
+    def profile(self, hour: float = None) -> Optional[str]:
+        if not self.profile_hours:
+            return None
+        hour = self.hour() if hour is None else hour
+        return self.profile_names[bisect.bisect_right(self.profile_hours, hour) - 1]
+
+    def weights(self, room_ids: List[int], profile: Optional[str]) -> List[float]:
+        overrides = self.profiles.get(profile, {})
+        return [overrides.get(str(i), self.room_weights.get(str(i), 1)) for i in room_ids]
+
+    def current_profile(self) -> Optional[str]:
+        """profile(), re-read from the clock at most once per PROFILE_CHECK_INTERVAL."""
+        checked, profile = self._profile
+        if now() - checked >= self.PROFILE_CHECK_INTERVAL:
+            profile = self.profile()
+            self._profile = (now(), profile)
+        return profile
+
+    def room_table(self) -> AliasTable:
+        """The alias table over the configured rooms for the current profile."""
+        profile = self.current_profile()
+        table = self.tables.get(profile)
+        if table is None:
+            table = self.tables[profile] = AliasTable(self.room_ids, self.weights(self.room_ids, profile))
+        return table
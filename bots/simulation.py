@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import logging
+import time
+import tracemalloc
+from collections import defaultdict
+from types import SimpleNamespace
+
+from . import fantasynames as names
+from .bots import PenguinBot
+from .clock import now, run
+from .engine import ArrayEngine
+from .constants import ITEM_TYPE, ROOM_AREAS
+from .plugin import BotPlugin
+from .record import BotRecord
+from .rng import streams
+from .traffic import TrafficReplayer, handler_callback
+
+# Headless stand-ins for a Houdini world: no PostgreSQL, no Redis, no sockets.
+# python -m houdini.plugins.bots.simulation --bots 1000 --players 50 --duration 3600
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+
+    async def hset(self, name, key, value):
+        self.hashes[name][key] = value
+
+
+class FakePermissions:
+    async def register(self, *_):
+        pass
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return False
+
+
+class FakeDatabase:
+    def transaction(self):
+        return FakeTransaction()
+
+
+class FakeRoom:
+    """In-memory Room: keeps the penguin registries and counts the packets sent to it."""
+
+    def __init__(self, room_id: int, name: str = None, igloo: bool = False):
+        self.id = room_id
+        self.name = name or str(room_id)
+        self.igloo = igloo
+        self.penguins_by_id = {}
+        self.penguins_by_username = {}
+        self.penguins_by_character_id = {}
+        self.waddles = {}
+        self.tables = {}
+        self.packets_sent = 0
+
+    async def add_penguin(self, p):
+        if p.room:
+            await p.room.remove_penguin(p)
+        self.penguins_by_id[p.id] = p
+        self.penguins_by_username[p.username] = p
+        if getattr(p, 'character', None):
+            self.penguins_by_character_id[p.character] = p
+        p.room = self
+        await self.send_xt('ap', p.id, p.x, p.y)
+
+    async def remove_penguin(self, p):
+        await self.send_xt('rp', p.id)
+        self.penguins_by_id.pop(p.id, None)
+        self.penguins_by_username.pop(p.username, None)
+        if getattr(p, 'character', None):
+            self.penguins_by_character_id.pop(p.character, None)
+        p.room = None
+        p.frame = 1
+
+    async def send_xt(self, *data, f=None):
+        self.packets_sent += 1
+        for penguin in filter(f, list(self.penguins_by_id.values())):
+            if isinstance(penguin, FakePlayer):
+                penguin.packets_received += 1
+
+
+class FakeServer:
+    """The parts of houdini.houdini.Houdini the plugin reads, held in memory."""
+
+    def __init__(self, room_ids, logger: logging.Logger):
+        self.config = SimpleNamespace(type='world', id=1, command_prefix='!')
+        self.logger = logger
+        self.redis = FakeRedis()
+        self.db = FakeDatabase()
+        self.permissions = FakePermissions()
+        self.chat_filter_words = {}
+
+        self.items = {}
+        for item_type in range(ITEM_TYPE.HEAD, ITEM_TYPE.PHOTO + 1):
+            for n in range(1, 6):
+                item_id = item_type * 100 + n
+                self.items[item_id] = SimpleNamespace(id=item_id, type=item_type)
+
+        self.rooms = {room_id: FakeRoom(room_id) for room_id in room_ids}
+        self.igloos = {n: SimpleNamespace(id=n) for n in range(1, 10)}
+        self.locations = {n: SimpleNamespace(id=n) for n in range(1, 5)}
+
+        self.penguins_by_id = {}
+        self.penguins_by_username = {}
+        self.penguins_by_character_id = {}
+        self.open_igloos_by_penguin_id = {}
+        self.peers_by_ip = {}
+
+
+class FakeAccount:
+    """A penguin table row, as returned by Penguin.query."""
+
+    def __init__(self, penguin_id: int, name: str):
+        self.id = penguin_id
+        self.username = name.lower()[:12]
+        self.nickname = name
+        self.color = streams.names.randrange(2, 14)
+        self.head = self.face = self.neck = self.body = 0
+        self.hand = self.feet = self.flag = self.photo = 0
+        self.character = None
+        self.igloo = penguin_id
+        self.coins = 0
+        self.moderator = False
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class SimulatedBot(PenguinBot):
+    """PenguinBot with its rows, igloo and coins kept in memory instead of the database."""
+
+    table = {}  # penguin id -> FakeAccount
+
+    @classmethod
+    async def fetch_rows(cls, penguin_ids):
+        return [cls.table[penguin_id] for penguin_id in penguin_ids if penguin_id in cls.table]
+
+    async def open_igloo(self):
+        self.server.open_igloos_by_penguin_id[self.id] = SimpleNamespace(
+            id=self.id,
+            type=self.rng.choice(list(self.server.igloos.keys())),
+            location=self.rng.choice(list(self.server.locations.keys())),
+        )
+
+    async def add_coins(self, coins: int):
+        self.coins += coins
+
+
+class FakePlayer:
+    """A scripted real player: wanders rooms, walks, throws snowballs and says hello."""
+
+    is_bot = False
+
+    def __init__(self, penguin_id: int, server: FakeServer, simulation: 'Simulation'):
+        self.id = penguin_id
+        self.username = f'player{penguin_id}'
+        self.nickname = f'Player{penguin_id}'
+        self.server = server
+        self.logger = server.logger
+        self.simulation = simulation
+        self.rng = streams.spawn('players', penguin_id)
+        self.room = None
+        self.x, self.y = 0, 0
+        self.frame = 1
+        self.character = None
+        self.muted = False
+        self.moderator = False
+        self.waddle = None
+        self.packets_received = 0
+
+    async def send_xt(self, *data):
+        self.packets_received += 1
+
+    async def close(self):
+        pass
+
+    def wander(self):
+        points = ROOM_AREAS[self.room.id]
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        self.x = int(self.rng.uniform(min(xs), max(xs)))
+        self.y = int(self.rng.uniform(min(ys), max(ys)))
+
+    async def join_room(self, room: FakeRoom):
+        await room.add_penguin(self)
+        self.wander()
+
+    async def wander_to(self, room: FakeRoom):
+        await self.join_room(room)
+        await self.simulation.dispatch('on_player_join_room', self, room, self.x, self.y)
+
+    async def script(self, until: float):
+        """Plays until the simulation clock passes `until`."""
+        await self.wander_to(self.rng.choice(self.simulation.player_rooms))
+        while now() < until:
+            await asyncio.sleep(self.rng.uniform(2, 10))
+            action = self.rng.random()
+            if action < 0.1:
+                await self.wander_to(self.rng.choice(self.simulation.player_rooms))
+            elif action < 0.7:
+                self.wander()
+                await self.simulation.dispatch('handle_player_movements', self, self.x, self.y)
+            elif action < 0.85:
+                target = self.rng.choice(list(self.room.penguins_by_id.values()))
+                await self.simulation.dispatch('handle_player_snowball', self, target.x, target.y)
+            else:
+                await self.simulation.dispatch('handle_player_safe_message', self, self.rng.choice([1, 310, 802, 410]))
+
+    async def leave(self):
+        if self.room:
+            await self.room.remove_penguin(self)
+
+
+class Simulation:
+    """Runs BotPlugin against a FakeServer with N bots and scripted players, measuring its cost."""
+
+    def __init__(self, bots: int = 100, players: int = 10, seed: int = None, rotation: bool = True, engine: bool = False):
+        self.bots = bots
+        self.engine = engine
+        self.players = players
+        self.seed = seed
+        self.rotation = rotation
+        self.logger = logging.getLogger('bots.simulation')
+        self.handler_latency = defaultdict(list)  # handler name -> wall seconds per call
+        self.events = 0
+        self.plugin = None
+        self.server = None
+        self.player_rooms = []
+        self.memory_per_bot = 0.0
+        self.memory_per_account = 0.0
+        self._tasks = []
+
+    async def setup(self):
+        streams.configure(self.seed)
+        self.server = FakeServer(BotPlugin.room_ids + [230], self.logger)
+        self.plugin = BotPlugin(self.server)
+        streams.configure(self.seed)  # BotPlugin reseeds from config.json, the simulation's seed wins
+        self.plugin.bot_class = SimulatedBot
+        self.plugin.engine = ArrayEngine(self.plugin) if self.engine else None
+        self.plugin.accounts = []
+        self.plugin.active_bots = []
+        self.plugin.spawned = []
+        self.player_rooms = [self.server.rooms[room_id] for room_id in self.plugin.room_ids]
+
+        rows = [FakeAccount(1000 + n, name) for n, name in enumerate(names.sample_names(self.bots))]
+        SimulatedBot.table = {row.id: row for row in rows}
+
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        self.plugin.accounts.extend(BotRecord.from_row(row) for row in rows)
+        after, _ = tracemalloc.get_traced_memory()
+        self.plugin.rotation.sync()
+        self.memory_per_account = (after - before) / max(1, len(rows))
+
+        before, _ = tracemalloc.get_traced_memory()
+        await self.plugin.populate(self.bots)
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.memory_per_bot = (after - before) / max(1, len(self.plugin.active_bots))
+
+        if self.rotation:
+            self._tasks.append(asyncio.create_task(self.plugin._rotation()))
+        if self.plugin.engine:
+            self._tasks.append(asyncio.create_task(self.plugin.engine.run()))
+
+    async def dispatch(self, handler_name: str, p, *args):
+        """Calls a plugin packet handler the way Houdini would, timing it."""
+        callback = handler_callback(getattr(type(self.plugin), handler_name))
+        started = time.perf_counter()
+        await callback(self.plugin, p, *args)
+        self.handler_latency[handler_name].append(time.perf_counter() - started)
+        self.events += 1
+
+    async def run(self, duration: float):
+        """Drives the world for `duration` seconds of simulation time."""
+        until = now() + duration
+        players = [FakePlayer(n, self.server, self) for n in range(1, self.players + 1)]
+        await asyncio.gather(*(p.script(until) for p in players))
+        for p in players:
+            await p.leave()
+
+    async def replay(self, path: str, speed: float = 1.0):
+        """Drives the world with recorded player traffic instead of scripted players."""
+        players = {}
+
+        def player(penguin_id):
+            players[penguin_id] = FakePlayer(penguin_id, self.server, self)
+            players[penguin_id].replayed = True  # not recorded again
+            return players[penguin_id]
+
+        replayer = TrafficReplayer(path, speed)
+        await replayer.replay(self.plugin, self.dispatch, player)
+        self.players = len(players)
+        for p in players.values():
+            await p.leave()
+
+    async def teardown(self):
+        for task in self._tasks:
+            task.cancel()
+        for bot in list(self.plugin.active_bots):
+            await bot.handle_disconnected()
+        self.plugin.active_bots = []
+
+    def report(self, wall_seconds: float, simulated_seconds: float) -> dict:
+        packets = sum(room.packets_sent for room in self.server.rooms.values())
+        latency = {}
+        for name, samples in self.handler_latency.items():
+            ordered = sorted(samples)
+            latency[name] = {
+                'calls': len(ordered),
+                'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+                'p99_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3),
+            }
+        return {
+            'bots': len(self.plugin.active_bots),
+            'players': self.players,
+            'simulated_seconds': round(simulated_seconds, 1),
+            'wall_seconds': round(wall_seconds, 2),
+            'events_per_second': round((self.events + packets) / wall_seconds, 1) if wall_seconds else 0.0,
+            'packets_sent': packets,
+            'memory_per_bot_kb': round(self.memory_per_bot / 1024, 2),
+            'memory_per_account_kb': round(self.memory_per_account / 1024, 3),
+            'handler_latency': latency,
+        }
+
+    async def __call__(self, duration: float, replay: str = None, speed: float = 1.0) -> dict:
+        await self.setup()
+        started_wall, started = time.perf_counter(), now()
+        try:
+            if replay:
+                await self.replay(replay, speed)
+            else:
+                await self.run(duration)
+        finally:
+            await self.teardown()
+        return self.report(time.perf_counter() - started_wall, now() - started)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Headless Bots 2.0 simulation")
+    parser.add_argument('--bots', type=int, default=100)
+    parser.add_argument('--players', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=600, help="simulated seconds")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--real-time', action='store_true', help="don't fast-forward the clock")
+    parser.add_argument('--engine', action='store_true', help="drive idle bots with the NumPy array engine")
+    parser.add_argument('--replay', help="a traffic recording to play instead of scripted players")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed multiplier")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    simulation = Simulation(args.bots, args.players, args.seed, engine=args.engine)
+    print(run(simulation(args.duration, args.replay, args.speed), virtual=not args.real_time))
@@ -0,0 +1,82 @@
+import math
+from collections import defaultdict
+from typing import Iterable, Iterator, Tuple
+
+from .clock import now
+
+
+class SpatialIndex:
+    """Real players' positions bucketed into a uniform grid per room, for the given rooms only.
+
+    Fed by the plugin's join and movement handlers; joining any other room drops the player.
+    Houdini doesn't tell plugins when a player disconnects, so entries are checked against the
+    penguin's live room on every query and by a sweep every PRUNE_INTERVAL seconds.
+    """
+
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(self, rooms: Iterable[int], cell: int = 40):
+        self.rooms = set(rooms)
+        self.cell = cell
+        self.cells = defaultdict(dict)  # (room id, column, row) -> {penguin id: penguin}
+        self.keys = {}  # penguin id -> its cell key
+        self._pruned = now()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _key(self, room_id: int, x: float, y: float) -> Tuple[int, int, int]:
+        return room_id, int(x) // self.cell, int(y) // self.cell
+
+    def move(self, p, room_id: int, x: float, y: float):
+        if now() - self._pruned >= self.PRUNE_INTERVAL:
+            self.prune()
+        if room_id not in self.rooms:
+            return self.remove(p)
+        key = self._key(room_id, x, y)
+        previous = self.keys.get(p.id)
+        if previous == key:
+            return
+        if previous is not None:
+            self._discard(p.id, previous)
+        self.cells[key][p.id] = p
+        self.keys[p.id] = key
+
+    def remove(self, p):
+        key = self.keys.pop(p.id, None)
+        if key is not None:
+            self._discard(p.id, key)
+
+    def prune(self):
+        """Drops players who have left their indexed room, disconnecting included."""
+        self._pruned = now()
+        for (room_id, _, _), cell in list(self.cells.items()):
+            for p in list(cell.values()):
+                if p.room is None or p.room.id != room_id:
+                    self.remove(p)
+
+    def _discard(self, penguin_id: int, key: tuple):
+        cell = self.cells.get(key)
+        if cell is not None:
+            cell.pop(penguin_id, None)
+            if not cell:
+                del self.cells[key]
+
+    def near(self, room_id: int, position: Tuple[float, float], radius: float) -> Iterator:
+        """Players in the room within `radius` of `position`, checking only the cells the circle touches."""
+        x, y = position
+        columns = range((int(x) - int(radius)) // self.cell, (int(x) + int(radius)) // self.cell + 1)
+        rows = range((int(y) - int(radius)) // self.cell, (int(y) + int(radius)) // self.cell + 1)
+        for column in columns:
+            for row in rows:
+                cell = self.cells.get((room_id, column, row))
+                if not cell:
+                    continue
+                for p in list(cell.values()):
+                    if p.room is None or p.room.id != room_id:
+                        self.remove(p)  # left the room since it was indexed
+                    elif math.dist(position, (p.x, p.y)) <= radius:
+                        yield p
+
+    def occupied(self, room_id: int, position: Tuple[float, float], radius: float) -> bool:
+        return next(self.near(room_id, position, radius), None) is not None
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import struct
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+from .clock import now
+
+# Player packets BotPlugin reacts to, and the handler each one reaches
+PACKETS = {
+    'j#jr': 'on_player_join_room',
+    'u#sp': 'handle_player_movements',
+    'u#sb': 'handle_player_snowball',
+    'u#ss': 'handle_player_safe_message',
+    'jw': 'handle_player_join_waddle',
+    'm#sm': 'handle_LLM_query',
+}
+CODES = list(PACKETS)  # a record stores the packet as its index here, so only ever append to PACKETS
+ARGUMENTS = {
+    'j#jr': (int, int, int),  # room id, x, y; recordings from before x and y have only the room
+    'u#sp': (int, int),
+    'u#sb': (int, int),
+    'u#ss': (int,),
+    'jw': (int,),
+    'm#sm': (int, str),
+}
+
+# File layout: a header, then one record per packet, appended as they arrive.
+HEADER = struct.Struct('<4sd')  # magic, wall-clock epoch the offsets count from
+RECORD = struct.Struct('<QBIH')  # milliseconds since the epoch, packet code, penguin id, payload length
+MAGIC = b'BTR2'
+# Earlier layouts, still readable; BTR1's 32-bit offsets wrap 49.7 days after the epoch, so it's never appended to
+RECORDS = {b'BTR1': struct.Struct('<IBIH'), MAGIC: RECORD}
+SEPARATOR = '\x1f'
+
+
+def handler_callback(handler):
+    """Unwraps Houdini's listener decorators down to the plugin method."""
+    while hasattr(handler, 'callback'):
+        handler = handler.callback
+    return handler
+
+
+class TrafficRecorder:
+    """Appends the player packets BotPlugin handles to a compact binary file.
+
+    With no path it records nothing, so handlers can call it unconditionally. Packets from
+    replayed players are skipped, so a replay is never recorded back into a recording. A
+    recording that fails is logged and stopped rather than raised into the handler.
+    """
+
+    def __init__(self, path: Optional[str] = None, logger=None):
+        self.path = path
+        self.logger = logger
+        self.file = None
+        self.epoch = 0.0
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def open(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER.size:
+            with open(self.path, 'rb') as f:
+                magic, self.epoch = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a traffic recording in the current format, record to a new file")
+            self.file = open(self.path, 'ab')
+        else:
+            self.epoch = time.time()
+            self.file = open(self.path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, self.epoch))
+
+    def record(self, packet: str, p, *args):
+        if not self.enabled or getattr(p, 'replayed', False):
+            return
+        try:
+            if self.file is None:
+                self.open()
+            payload = SEPARATOR.join(str(getattr(arg, 'id', arg)) for arg in args).encode('utf-8')
+            offset = int((time.time() - self.epoch) * 1000)
+            self.file.write(RECORD.pack(offset, CODES.index(packet), p.id, len(payload)) + payload)
+            self.recorded += 1
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Stopped recording traffic to {self.path} after {self.recorded} packets: {e}")
+            try:
+                self.close()
+            except OSError:
+                self.file = None
+            self.path = None
+
+    def flush(self):
+        if self.file:
+            self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def read(path: str) -> Iterator[Tuple[float, str, int, tuple]]:
+    """Yields (seconds since the first record, packet, penguin id, arguments) in file order."""
+    with open(path, 'rb') as f:
+        magic, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic not in RECORDS:
+            raise ValueError(f"{path} is not a traffic recording")
+        record = RECORDS[magic]
+
+        first = None
+        while True:
+            head = f.read(record.size)
+            if len(head) < record.size:
+                return  # a record cut short by a crash is dropped
+            offset, code, penguin_id, length = record.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+
+            packet = CODES[code]
+            types = ARGUMENTS[packet]
+            values = payload.decode('utf-8').split(SEPARATOR, len(types) - 1)
+            first = offset if first is None else first
+            yield (offset - first) / 1000, packet, penguin_id, tuple(t(v) for t, v in zip(types, values))
+
+
+class ReplayPlayer:
+    """Stands in for a recorded player: carries the room and position the handlers read."""
+
+    is_bot = False
+    replayed = True  # not recorded again
+
+    def __init__(self, penguin_id: int, server):
+        self.id = penguin_id
+        self.username = f'replay{penguin_id}'
+        self.nickname = f'Replay{penguin_id}'
+        self.server = server
+        self.logger = server.logger
+        self.room = None
+        self.x, self.y = 0, 0
+        self.frame = 1
+        self.character = None
+        self.muted = False
+        self.moderator = False
+        self.waddle = None
+
+    async def send_xt(self, *data):
+        pass
+
+    async def close(self):
+        pass
+
+    async def join_room(self, room):
+        self.room = room
+
+
+class TrafficReplayer:
+    """Feeds a recording back through BotPlugin's handlers at 1x or accelerated speed."""
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.replayed = 0
+        self.skipped = 0
+
+    async def replay(self, plugin, dispatch: Callable = None, player: Callable = None):
+        """Replays every record, keeping the recorded gaps divided by `speed`.
+
+        `dispatch(handler_name, p, *args)` defaults to calling the plugin's handlers directly;
+        the simulation harness passes its timed dispatch. `player(penguin_id)` returns the stand-in
+        for a recorded player, by default a ReplayPlayer that isn't added to the world's rooms.
+        """
+        players = {}
+        dispatch = dispatch or (lambda name, p, *args: handler_callback(getattr(type(plugin), name))(plugin, p, *args))
+        player = player or (lambda penguin_id: ReplayPlayer(penguin_id, plugin.server))
+
+        started = now()
+        tasks = set()
+        for offset, packet, penguin_id, args in read(self.path):
+            delay = started + offset / self.speed - now()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if penguin_id not in players:
+                players[penguin_id] = player(penguin_id)
+            p = players[penguin_id]
+
+            if packet == 'j#jr':
+                room = plugin.server.rooms.get(args[0])
+                if room is None:
+                    self.skipped += 1
+                    continue
+                await p.join_room(room)
+                if len(args) == 3:
+                    p.x, p.y = args[1:]
+                args = (room, p.x, p.y)
+            elif packet == 'u#sp':
+                p.x, p.y = args
+            elif p.room is None:
+                self.skipped += 1  # recording started after this player joined their room
+                continue
+
+            task = asyncio.create_task(dispatch(PACKETS[packet], p, *args))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            self.replayed += 1
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return self.replayed